@@ -0,0 +1,108 @@
+"""On-disk cache of scenario and model artifacts shared across server restarts and worker processes.
+
+Artifacts are keyed by a hash of everything they depend on, so changed data or settings never load stale files:
+- scenarios: scenarios_<hash>.npz with the disruption matrix (scenarios x nodes) and exact probabilities
+- extensive-form models: extensive_form_<hash>.mps (written with model.write, loaded with grb.read)
+Files are written to a temporary name and moved into place (atomic), so processes never read partial files.
+"""
+from fractions import Fraction
+import hashlib
+import os
+import threading
+import numpy as np
+from llms_decision_support.python_files.coffee_data import network_data_hash
+from llms_decision_support.python_files.scenarios import generate_scenarios, scenarios_from_matrix
+
+try:
+    import gurobipy as grb
+    from llms_decision_support.python_files.extensive_form import build_extensive_form, extensive_form_variables
+except Exception:
+    grb = None
+
+ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "artifact_cache")
+# Change when the layout of build_extensive_form() changes (invalidates stored models)
+MODEL_FORMAT_VERSION = 1
+
+def _scenarios_digest(scenarios, scenario_probs):
+    defaults = np.array([list(s_defs.values()) + list(r_defs.values()) for s_defs, r_defs in scenarios], dtype=bool)
+    content = defaults.tobytes() + str(defaults.shape).encode() + ";".join(str(p) for p in scenario_probs).encode()
+    return hashlib.sha256(content).hexdigest()
+
+class ArtifactCache():
+    def __init__(self, directory=ARTIFACT_DIR, enabled=True):
+        """
+        Args:
+            directory (str): artifact directory (created on first write).
+            enabled (bool): if False, artifacts are neither loaded nor stored.
+        """
+        self.directory = directory
+        self.enabled = enabled
+
+    def _path(self, kind, key, extension):
+        return os.path.join(self.directory, f"{kind}_{key}{extension}")
+
+    def _write_atomic(self, path, write):
+        """Write via write(tmp_path) and move the file into place; skipped if the directory is not writable.
+        """
+        base, extension = os.path.splitext(path)
+        # Keep the extension (Gurobi derives the file format from it)
+        tmp_path = f"{base}.{os.getpid()}.{threading.get_ident()}.tmp{extension}"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            # Caching is best effort (e.g. read-only directory)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def scenarios(self, s_default_prob, r_default_prob, scenario_mode="sampled", num_scenarios=1000, seed=42, aggregate=True, sampler="legacy"):
+        """Load or generate (and store) weighted disruption scenarios; arguments as for generate_scenarios().
+
+        Returns:
+            tuple: scenarios ((supplier defaults, roastery defaults) tuples of dicts) and their probabilities (Fraction).
+        """
+        key = network_data_hash({'s_default_prob': s_default_prob, 'r_default_prob': r_default_prob},
+                                scenario_mode=scenario_mode, num_scenarios=num_scenarios, seed=seed, aggregate=aggregate, sampler=sampler)
+        path = self._path("scenarios", key, ".npz")
+        if self.enabled and os.path.exists(path):
+            with np.load(path, allow_pickle=False) as artifact:
+                scenarios = scenarios_from_matrix(artifact['defaults'], artifact['suppliers'], artifact['roasteries'])
+                scenario_probs = [Fraction(str(p)) for p in artifact['probs']]
+            return scenarios, scenario_probs
+
+        scenarios, scenario_probs = generate_scenarios(s_default_prob, r_default_prob, scenario_mode, num_scenarios, seed, aggregate, sampler)
+        if self.enabled:
+            defaults = np.array([list(s_defs.values()) + list(r_defs.values()) for s_defs, r_defs in scenarios], dtype=bool)
+            self._write_atomic(path, lambda tmp_path: np.savez(
+                tmp_path, suppliers=np.array(list(s_default_prob)), roasteries=np.array(list(r_default_prob)),
+                defaults=defaults, probs=np.array([str(p) for p in scenario_probs])))
+        return scenarios, scenario_probs
+
+    def extensive_form(self, env, data, scenarios, scenario_probs):
+        """Load or build (and store) the extensive-form model.
+
+        Args:
+            env (grb.Env): Gurobi environment of the model.
+            data (dict): coffee network data.
+            scenarios (list): (supplier defaults, roastery defaults) tuples of dicts.
+            scenario_probs (list): probability per scenario.
+
+        Returns:
+            tuple: Gurobi model and its variables dict (see build_extensive_form()).
+        """
+        key = network_data_hash(data, scenarios=_scenarios_digest(scenarios, scenario_probs), version=MODEL_FORMAT_VERSION)
+        path = self._path("extensive_form", key, ".mps")
+        if self.enabled and os.path.exists(path):
+            model = grb.read(path, env)
+            return model, extensive_form_variables(model, data, len(scenarios))
+
+        model = grb.Model(env=env)
+        variables = build_extensive_form(model, data, scenarios, scenario_probs)
+        model.update()
+        if self.enabled:
+            self._write_atomic(path, model.write)
+        return model, variables
+
+# Shared instance
+artifact_cache = ArtifactCache()
@@ -0,0 +1,149 @@
+"""Scaling benchmarks of the evaluation pipeline on synthetic instances (see instance_generator.py).
+
+Times per instance size: scenario generation, extensive-form build, 1st-stage solve (extensive form
+and Benders), evaluate_stochastic (fixed activations), evaluate_deterministic_batch (all disruption
+patterns of the scenarios) and the all-combinations export (export_all_combinations(), written to a
+temporary directory; skipped above max_combinations). A failed stage is reported in "errors".
+
+Usage (from src_otree):
+    python -m llms_decision_support.python_files.benchmarks --sizes 3x2x3,10x5x20 --scenarios 1000,10000 --json benchmarks.json
+"""
+import argparse
+import json
+import tempfile
+import time
+from llms_decision_support.python_files.artifact_cache import artifact_cache
+from llms_decision_support.python_files.benders import BendersSolver
+from llms_decision_support.python_files.coffee_deterministic_evaluation import evaluate_deterministic_batch
+from llms_decision_support.python_files.coffee_stochastic_csv_and_json_export import export_all_combinations
+from llms_decision_support.python_files.coffee_stochastic_evaluation import StochasticModel
+from llms_decision_support.python_files.decisions import ROASTERY_LEVELS
+from llms_decision_support.python_files.instance_generator import generate_network_data
+
+DEFAULT_SIZES = [(3, 2, 3), (10, 5, 20), (30, 10, 50)]
+DEFAULT_SCENARIOS = [1000, 10000]
+
+# Timed stages (columns of the result rows)
+STAGES = ["scenarios", "build", "solve_extensive_form", "solve_benders", "evaluate_stochastic", "evaluate_deterministic",
+          "export_all_combinations"]
+
+def _timed(function):
+    """Run function and get its duration (s) and result; on errors (e.g. size-limited license), the duration
+    is None and the error message is returned instead of the result.
+    """
+    start_time = time.perf_counter()
+    try:
+        result = function()
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    return time.perf_counter() - start_time, result
+
+def _run_stage(row, stage, function):
+    """Time a stage into row[stage] (a failure is recorded in row["errors"]).
+
+    Returns:
+        object: result of function (None if the stage failed).
+    """
+    row[stage], result = _timed(function)
+    if row[stage] is None:
+        row["errors"][stage] = result
+        return None
+    return result
+
+def benchmark_instance(data, max_combinations=1000):
+    """Time the pipeline stages on one instance (artifact cache disabled, i.e. cold timings).
+
+    Args:
+        data (dict): coffee network data.
+        max_combinations (int): max. number of activation combinations for the all-combinations export.
+
+    Returns:
+        dict: instance size and duration in seconds per stage (None if skipped or failed; see "errors").
+    """
+    suppliers, roasteries = list(data['s_capacity']), list(data['r_capacity'])
+    num_combinations = 2 ** len(suppliers) * (len(ROASTERY_LEVELS) + 1) ** len(roasteries)
+    row = {"suppliers": len(suppliers), "roasteries": len(roasteries), "customers": len(data['coffee_demand']['light']),
+           "num_scenarios": data['num_scenarios'], "patterns": None, "variables": None, "constraints": None,
+           **{stage: None for stage in STAGES}, "errors": {}}
+    all_activated = (1,) * len(suppliers) + (len(ROASTERY_LEVELS),) * len(roasteries)
+
+    cache_enabled, artifact_cache.enabled = artifact_cache.enabled, False
+    try:
+        stoch_model = _run_stage(row, "scenarios", lambda: StochasticModel(data=data))
+        if stoch_model is None:
+            # All later stages need the scenarios
+            return row
+        with stoch_model:
+            row["patterns"] = len(stoch_model.scenarios)
+            # Lease the env outside of the timings (a failure shows in the stages)
+            _timed(stoch_model.get_env)
+            _run_stage(row, "build", stoch_model.build_extensive_form)
+            if stoch_model.model is not None:
+                row["variables"], row["constraints"] = stoch_model.model.NumVars, stoch_model.model.NumConstrs
+                _run_stage(row, "solve_extensive_form", stoch_model.model.optimize)
+            _run_stage(row, "solve_benders", lambda: BendersSolver(data, stoch_model.scenarios, stoch_model.scenario_probs).solve(stoch_model.get_env()))
+            _run_stage(row, "evaluate_stochastic", lambda: stoch_model.compute_profit_distribution(all_activated))
+            outcomes = [[s_defs[s] for s in suppliers] + [r_defs[r] for r in roasteries] for s_defs, r_defs in stoch_model.scenarios]
+
+        # Deterministic evaluation of the all-activated decisions under the disruption patterns of the scenarios
+        _run_stage(row, "evaluate_deterministic", lambda: evaluate_deterministic_batch([all_activated], outcomes, data=data))
+
+        if num_combinations <= max_combinations:
+            with tempfile.TemporaryDirectory() as output_dir:
+                _run_stage(row, "export_all_combinations", lambda: export_all_combinations(data=data, output_dir=output_dir, force=True))
+    finally:
+        artifact_cache.enabled = cache_enabled
+    return row
+
+def run_benchmarks(sizes=DEFAULT_SIZES, scenario_counts=DEFAULT_SCENARIOS, num_risky_nodes=5, max_combinations=1000, seed=0):
+    """Benchmark generated instances of all sizes and scenario counts.
+
+    Args:
+        sizes (list): (suppliers, roasteries, customers) tuples.
+        scenario_counts (list): numbers of sampled scenarios.
+        num_risky_nodes (int): nodes with nonzero default probability (capped by the number of nodes).
+        max_combinations (int): see benchmark_instance().
+        seed (int): instance seed.
+
+    Returns:
+        list: one row per instance (see benchmark_instance()).
+    """
+    rows = []
+    for num_suppliers, num_roasteries, num_customers in sizes:
+        for num_scenarios in scenario_counts:
+            data = generate_network_data(num_suppliers, num_roasteries, num_customers,
+                                         min(num_risky_nodes, num_suppliers + num_roasteries), num_scenarios, seed=seed)
+            rows.append(benchmark_instance(data, max_combinations))
+    return rows
+
+def format_table(rows):
+    """Format benchmark rows as a text table (durations in seconds).
+    """
+    columns = ["suppliers", "roasteries", "customers", "num_scenarios", "patterns", "variables"] + STAGES
+    cells = [[f"{row[column]:.3f}" if isinstance(row[column], float) else "-" if row[column] is None else str(row[column])
+              for column in columns] for row in rows]
+    widths = [max(len(column), *(len(cell[i]) for cell in cells)) for i, column in enumerate(columns)]
+    lines = ["  ".join(column.rjust(width) for column, width in zip(columns, widths))]
+    lines += ["  ".join(cell.rjust(width) for cell, width in zip(cell_row, widths)) for cell_row in cells]
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time model build, solve and evaluations on synthetic coffee networks.")
+    parser.add_argument("--sizes", default=",".join("x".join(map(str, size)) for size in DEFAULT_SIZES),
+                        help="comma-separated SUPPLIERSxROASTERIESxCUSTOMERS")
+    parser.add_argument("--scenarios", default=",".join(map(str, DEFAULT_SCENARIOS)), help="comma-separated scenario counts")
+    parser.add_argument("--risky-nodes", type=int, default=5)
+    parser.add_argument("--max-combinations", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    rows = run_benchmarks([tuple(int(n) for n in size.split("x")) for size in args.sizes.split(",")],
+                          [int(n) for n in args.scenarios.split(",")], args.risky_nodes, args.max_combinations, args.seed)
+    print(format_table(rows))
+    for row in rows:
+        for stage, error in row["errors"].items():
+            print(f"{row['suppliers']}x{row['roasteries']}x{row['customers']}, {row['num_scenarios']} scenarios, {stage}: {error}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
@@ -0,0 +1,154 @@
+"""L-shaped (Benders) decomposition of the two-stage stochastic program.
+
+The extensive form holds one copy of the 2nd-stage flow problem per scenario. Here, a small master MIP
+only contains the activations (s_activation, r_activation) and one profit estimate theta[n] per distinct
+disruption pattern n. The flow problems of the patterns are solved separately for the master's current
+activations; their capacity duals give optimality cuts
+    theta[n] <= demand_value + sum(price * available capacity(activations, pattern n))
+that are added to the master (as lazy constraints) until its bound meets the best evaluated activations.
+
+Memory and solve time grow with the number of distinct disruption patterns (not with num_scenarios),
+and the flow problems of one iteration can be solved in parallel.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import scipy.sparse as sp
+import gurobipy as grb
+from llms_decision_support.python_files.decisions import ROASTERY_LEVELS
+from llms_decision_support.python_files.env_pool import env_pool
+from llms_decision_support.python_files.recourse_solver import RecourseSolver
+
+class BendersSolver():
+    def __init__(self, data, scenarios, scenario_probs, workers=1, tolerance=1e-6):
+        """
+        Args:
+            data (dict): coffee network data (see coffee_data.py).
+            scenarios (list): (supplier defaults, roastery defaults) tuples of dicts (identical patterns are merged).
+            scenario_probs (list): probability per scenario.
+            workers (int): threads solving the flow problems of one iteration.
+            tolerance (float): relative optimality gap at which the solve stops.
+        """
+        self.data = data
+        self.workers = workers
+        self.tolerance = tolerance
+        self.suppliers = list(data['s_capacity'].keys())
+        self.roasteries = list(data['r_capacity'].keys())
+        self.recourse_solver = RecourseSolver(data, backend="scipy")
+
+        # Distinct disruption patterns (columns: suppliers, then roasteries) and their probabilities
+        disruptions = np.array([[s_defs[s] for s in self.suppliers] + [r_defs[r] for r in self.roasteries]
+                                for s_defs, r_defs in scenarios], dtype=bool)
+        self.patterns, inverse = np.unique(disruptions, axis=0, return_inverse=True)
+        self.pattern_probs = np.bincount(inverse.reshape(-1), weights=[float(p) for p in scenario_probs], minlength=len(self.patterns))
+
+        # Capacity per activation variable (suppliers, then roasteries x levels)
+        self.s_capacity = np.array([data['s_capacity'][s] for s in self.suppliers], dtype=float)
+        self.r_capacity = np.array([[data['r_capacity'][r][lvl] for lvl in ROASTERY_LEVELS] for r in self.roasteries], dtype=float)
+        self.fixed_costs = np.array([data['fixed_supplier_cost'][s] for s in self.suppliers]
+                                    + [data['fixed_roasting_cost'][r][lvl] for r in self.roasteries for lvl in ROASTERY_LEVELS], dtype=float)
+
+    def _available_capacities(self, activations):
+        """Get available capacities per pattern (rows) for 0/1 activations (suppliers, then roasteries x levels).
+        """
+        num_s = len(self.suppliers)
+        s_available = self.s_capacity * activations[:num_s] * ~self.patterns[:, :num_s]
+        r_available = (self.r_capacity * activations[num_s:].reshape(len(self.roasteries), -1)).sum(axis=1) * ~self.patterns[:, num_s:]
+        return np.round(s_available).astype(int), np.round(r_available).astype(int)
+
+    def _subproblems(self, activations):
+        """Solve the flow problems of all patterns (distinct capacity states only once).
+
+        Returns:
+            list: (contribution, supplier prices, roastery prices, demand value) per pattern.
+        """
+        s_available, r_available = self._available_capacities(activations)
+        states = [(tuple(s.tolist()), tuple(r.tolist())) for s, r in zip(s_available, r_available)]
+        unique_states = list(dict.fromkeys(states))
+        if self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                solutions = dict(zip(unique_states, executor.map(lambda state: self.recourse_solver.capacity_prices(*state), unique_states)))
+        else:
+            solutions = {state: self.recourse_solver.capacity_prices(*state) for state in unique_states}
+        return [solutions[state] for state in states]
+
+    def _cuts(self, solutions, patterns):
+        """Get the optimality cuts (A @ [activations, theta] <= b) of the given patterns.
+        """
+        num_s, num_first = len(self.suppliers), len(self.fixed_costs)
+        a_matrix = np.zeros((len(patterns), num_first + len(self.patterns)))
+        b = np.zeros(len(patterns))
+        for row, n in enumerate(patterns):
+            _, s_prices, r_prices, demand_value = solutions[n]
+            available = ~self.patterns[n]
+            a_matrix[row, :num_s] = -s_prices * self.s_capacity * available[:num_s]
+            a_matrix[row, num_s:num_first] = -((r_prices * available[num_s:]).reshape(-1, 1) * self.r_capacity).reshape(-1)
+            a_matrix[row, num_first + n] = 1
+            b[row] = demand_value
+        return sp.csr_matrix(a_matrix), b
+
+    def solve(self, env=None):
+        """Solve for the activations with max. expected profit.
+
+        The master is solved once (branch-and-cut): every new incumbent's flow problems are solved in a
+        callback, and cuts of patterns whose profit estimate is too high are added as lazy constraints.
+
+        Args:
+            env (grb.Env): Gurobi environment of the master (checked out of env_pool if None).
+
+        Returns:
+            dict: "decision_key" (canonical, see decisions.py), "ev" (expected profit), "iterations"
+            (evaluated incumbents), "cuts" (number of optimality cuts) and "gap" (remaining relative gap).
+        """
+        if env is None:
+            with env_pool.checkout() as env:
+                return self.solve(env)
+
+        num_s, num_r, num_l = len(self.suppliers), len(self.roasteries), len(ROASTERY_LEVELS)
+        num_first, num_patterns = len(self.fixed_costs), len(self.patterns)
+        bonus = self.data['fixed_income_bonuspool']
+
+        with grb.Model(env=env) as master:
+            y = master.addMVar(num_first, vtype=grb.GRB.BINARY, name="activation")
+            theta = master.addMVar(num_patterns, lb=-grb.GRB.INFINITY, name="theta")
+            x = grb.MVar.fromlist(y.tolist() + theta.tolist())
+            # Roastery activated in at most one level
+            level_choice = sp.hstack([sp.csr_matrix((num_r, num_s)), sp.kron(sp.identity(num_r), np.ones((1, num_l)))], format='csr')
+            master.addMConstr(level_choice, y, '<', np.ones(num_r))
+            master.setMObjective(None, np.concatenate([-self.fixed_costs, self.pattern_probs]), bonus, xc=x, sense=grb.GRB.MAXIMIZE)
+            master.Params.LazyConstraints = 1
+            master.Params.MIPGap = self.tolerance
+
+            # Initial cuts at the max. capacity activations (bound theta from above)
+            max_activations = np.concatenate([np.ones(num_s), np.tile(np.eye(num_l)[-1], num_r)])
+            a_matrix, b = self._cuts(self._subproblems(max_activations), np.arange(num_patterns))
+            master.addMConstr(a_matrix, x, '<', b)
+            stats = {"iterations": 0, "cuts": num_patterns}
+            y_vars, theta_vars, x_vars = y.tolist(), theta.tolist(), x.tolist()
+
+            def add_cuts(model, where):
+                if where != grb.GRB.Callback.MIPSOL:
+                    return
+                activations = np.round(model.cbGetSolution(y_vars))
+                theta_values = np.array(model.cbGetSolution(theta_vars))
+                solutions = self._subproblems(activations)
+                contributions = np.array([solution[0] for solution in solutions])
+                # Cuts for patterns whose profit estimate exceeds their flow problem's optimum
+                patterns = np.flatnonzero(theta_values > contributions + 1e-6 * np.maximum(1, np.abs(contributions)))
+                a_matrix, b = self._cuts(solutions, patterns)
+                for row in range(len(patterns)):
+                    columns = a_matrix.indices[a_matrix.indptr[row]:a_matrix.indptr[row + 1]]
+                    model.cbLazy(grb.LinExpr(a_matrix.data[a_matrix.indptr[row]:a_matrix.indptr[row + 1]].tolist(),
+                                             [x_vars[j] for j in columns]) <= b[row])
+                stats["iterations"] += 1
+                stats["cuts"] += len(patterns)
+
+            master.optimize(add_cuts)
+            if master.SolCount == 0:
+                raise RuntimeError(f"Benders master not solved (status {master.Status})")
+            best_activations, gap = np.round(y.X), master.MIPGap
+
+        contributions = np.array([solution[0] for solution in self._subproblems(best_activations)])
+        ev = bonus - self.fixed_costs @ best_activations + self.pattern_probs @ contributions
+        levels = best_activations[num_s:].reshape(num_r, num_l) @ np.arange(1, num_l + 1)
+        decision_key = tuple(int(act) for act in best_activations[:num_s]) + tuple(int(level) for level in levels)
+        return {"decision_key": decision_key, "ev": float(ev), "iterations": stats["iterations"], "cuts": stats["cuts"], "gap": float(gap)}
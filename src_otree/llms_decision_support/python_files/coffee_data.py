@@ -0,0 +1,98 @@
+"""Coffee network data shared by the evaluation engines.
+
+The LLM-facing source code (coffee_stochastic.py) keeps its own copy of the data on purpose
+(the writer LLM needs to see and modify it); keep both in sync when changing the setting.
+"""
+import copy
+import hashlib
+import json
+
+COFFEE_NETWORK_DATA = {
+    's_capacity': {'supplier1': 250, 'supplier2': 100, 'supplier3': 200},
+    'r_capacity': {'roastery1': {'low': 125, 'high': 250}, 'roastery2': {'low': 125, 'high': 250}},
+    'fixed_supplier_cost': {'supplier1': 250, 'supplier2': 600, 'supplier3': 750},
+    'fixed_roasting_cost': {'roastery1': {'low': 400, 'high': 600}, 'roastery2': {'low': 500, 'high': 700}},
+    'variable_roasting_cost_light': {'roastery1': 3, 'roastery2': 5},
+    'variable_roasting_cost_dark': {'roastery1': 5, 'roastery2': 6},
+    'shipping_cost_s_to_r': {('supplier1', 'roastery1'): 5, ('supplier1', 'roastery2'): 4,
+                             ('supplier2', 'roastery1'): 6, ('supplier2', 'roastery2'): 3,
+                             ('supplier3', 'roastery1'): 2, ('supplier3', 'roastery2'): 7},
+    'shipping_cost_r_to_c': {('roastery1', 'customer1'): 5, ('roastery1', 'customer2'): 3,
+                             ('roastery1', 'customer3'): 6, ('roastery2', 'customer1'): 4,
+                             ('roastery2', 'customer2'): 5, ('roastery2', 'customer3'): 2},
+    'coffee_demand': {'light': {'customer1': 20, 'customer2': 30, 'customer3': 40},
+                      'dark': {'customer1': 20, 'customer2': 20, 'customer3': 100}},
+    'selling_price': 30,
+    'fixed_income_bonuspool': 2210,
+    'num_scenarios': 1000,
+    's_default_prob': {'supplier1': 0.3, 'supplier2': 0.0, 'supplier3': 0.0},
+    'r_default_prob': {'roastery1': 0.1, 'roastery2': 0.0},
+}
+
+def get_coffee_network_data():
+    """Get a (modifiable) copy of the coffee network data.
+
+    Returns:
+        dict: network data with the same names as used in coffee_stochastic.py.
+    """
+    return copy.deepcopy(COFFEE_NETWORK_DATA)
+
+def _json_compatible(value):
+    if isinstance(value, dict):
+        return {"|".join(map(str, k)) if isinstance(k, tuple) else str(k): _json_compatible(v) for k, v in value.items()}
+    return value
+
+def network_data_hash(data, **settings):
+    """Get a stable hash of network data and further settings (e.g. scenario mode).
+
+    Args:
+        data (dict): coffee network data.
+        **settings: further (JSON-serializable) settings that change the results.
+
+    Returns:
+        str: hex digest identifying the data and settings.
+    """
+    content = json.dumps({"data": _json_compatible(data), "settings": settings})
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def network_data_from_namespace(namespace):
+    """Collect the network data from variables of the same names (e.g. globals() of coffee_stochastic.py).
+
+    Args:
+        namespace (dict): variables incl. s_capacity, r_capacity, ..., r_default_prob.
+
+    Returns:
+        dict: coffee network data.
+    """
+    return {key: namespace[key] for key in COFFEE_NETWORK_DATA}
+
+def _merge_changes(values, changes, path):
+    if not isinstance(values, dict):
+        if isinstance(changes, dict):
+            raise ValueError(f"'{path}' is a single value, not a dict")
+        return changes
+    if not isinstance(changes, dict):
+        raise ValueError(f"'{path}' needs a dict of changed entries, e.g. {{{next(iter(values))!r}: ...}}")
+    merged = copy.deepcopy(values)
+    for key, change in changes.items():
+        if key not in values:
+            raise ValueError(f"Unknown key {key!r} in '{path}' (use one of {list(values)})")
+        merged[key] = _merge_changes(values[key], change, f"{path}[{key!r}]")
+    return merged
+
+def apply_parameter_changes(data, parameter_changes):
+    """Get a copy of the network data with changed parameter values (the network structure stays as is).
+
+    Args:
+        data (dict): coffee network data.
+        parameter_changes (dict): changed entries only, with the names of the data,
+            e.g. {'s_capacity': {'supplier2': 150}, 'shipping_cost_s_to_r': {('supplier1', 'roastery2'): 6}, 'selling_price': 32}.
+
+    Returns:
+        dict: changed network data.
+    """
+    unknown_parameters = set(parameter_changes) - set(data)
+    if unknown_parameters:
+        raise ValueError(f"Unknown parameters: {sorted(unknown_parameters)} (use one of {list(data)})")
+    return {key: _merge_changes(data[key], parameter_changes[key], key) if key in parameter_changes else copy.deepcopy(value)
+            for key, value in data.items()}
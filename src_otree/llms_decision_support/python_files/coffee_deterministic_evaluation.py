@@ -1,5 +1,72 @@
+import itertools
 import gurobipy as grb
 import numpy as np
+from llms_decision_support.python_files.coffee_data import get_coffee_network_data
+from llms_decision_support.python_files.decisions import ROASTERY_LEVELS, all_decision_keys, decisions_from_key
+from llms_decision_support.python_files.env_pool import env_pool
+from llms_decision_support.python_files.model_pool import ModelPool
+from llms_decision_support.python_files.recourse_solver import RecourseSolver
+
+# "gurobi": persistent deterministic model (see DeterministicEvaluator); "scipy": flow problem via HiGHS (no Gurobi env/license needed)
+SOLVER_BACKEND = "gurobi"
+
+# Max. number of deterministic models (each holds one of the Gurobi envs reserved in env_pool while it exists)
+MAX_DETERMINISTIC_MODELS = 2
+
+# Lazily created recourse solver for the "scipy" backend and batch evaluations (caches solves per capacity state)
+_recourse_solver = None
+
+def _get_recourse_solver():
+    global _recourse_solver
+    if _recourse_solver is None:
+        _recourse_solver = RecourseSolver(get_coffee_network_data(), backend="scipy")
+    return _recourse_solver
+
+def _evaluate_with_recourse_solver(fixed_activation_decisions, specific_disruption_outcome):
+    """Evaluate one deterministic scenario with the (Gurobi-free) recourse solver.
+
+    Decisions are read as by DeterministicEvaluator: nodes without a decision (and roasteries activated
+    without a level) stay free, i.e. the best of their activation choices is taken; disruptions only apply
+    to nodes with an activation decision.
+
+    Args:
+        fixed_activation_decisions (dict): see evaluate_deterministic().
+        specific_disruption_outcome (dict): see evaluate_deterministic().
+
+    Returns:
+        float: profit (rounded to whole COF$).
+    """
+    solver = _get_recourse_solver()
+
+    # Possible activations per node (0/1 per supplier, 0/level number per roastery) and applied disruptions
+    levels = {f"activate ({lvl})": i for i, lvl in enumerate(ROASTERY_LEVELS, start=1)}
+    choices = []
+    disrupted = []
+    for s in solver.suppliers:
+        if s not in fixed_activation_decisions:
+            choices.append([0, 1])
+            disrupted.append(False)
+        elif fixed_activation_decisions[s] == "activate":
+            choices.append([1])
+            disrupted.append(specific_disruption_outcome.get(s, False))
+        else:
+            choices.append([0])
+            disrupted.append(False)
+    for r in solver.roasteries:
+        decision = fixed_activation_decisions.get(r)
+        if r not in fixed_activation_decisions:
+            choices.append(list(range(len(ROASTERY_LEVELS) + 1)))
+            disrupted.append(False)
+        elif decision == "do not activate":
+            choices.append([0])
+            disrupted.append(False)
+        else:
+            choices.append([levels[decision]] if decision in levels else list(range(len(ROASTERY_LEVELS) + 1)))
+            disrupted.append(specific_disruption_outcome.get(r, False))
+
+    # Free nodes are optimized, i.e. the best profit over all remaining activation combinations
+    profits = evaluate_deterministic_batch(list(itertools.product(*choices)), [disrupted])
+    return profits.max()
 
 def evaluate_deterministic(fixed_activation_decisions, specific_disruption_outcome):
     """
@@ -20,43 +87,89 @@ def evaluate_deterministic(fixed_activation_decisions, specific_disruption_outco
     Returns:
         Profit as Float number for this specific decisions and disruptions setting as per the input parameters.
     """
+    if SOLVER_BACKEND == "scipy":
+        return _evaluate_with_recourse_solver(fixed_activation_decisions, specific_disruption_outcome)
 
-    # Supply chain data
-    supplier_capacity = {'supplier1': 250, 'supplier2': 100, 'supplier3': 200}
+    with evaluator_pool.checkout() as evaluator:
+        return evaluator.evaluate(fixed_activation_decisions, specific_disruption_outcome)
 
-    roastery_capacity = {'roastery1': 125, 'roastery2': 125}
+def evaluate_deterministic_batch(decision_keys, disruption_outcomes, data=None):
+    """Evaluate activation decisions under many disruption outcomes at once (e.g. payout audits, random disruption risks).
 
-    fixed_supplier_cost = {'supplier1': 250, 'supplier2': 600, 'supplier3': 750}
+    Every (decisions, outcome) pair is reduced to its available capacity per node; identical capacity states
+    are solved only once (flow problem via the recourse solver, no Gurobi env/license needed). Results equal
+    evaluate_deterministic() for the same decisions and outcome.
 
-    fixed_roasting_cost = {
-        'roastery1': {'low': 400, 'high': 600},
-        'roastery2': {'low': 500, 'high': 700},
-    }
-
-    variable_roasting_cost_light = {'roastery1': 3, 'roastery2': 5}
-    variable_roasting_cost_dark = {'roastery1': 5, 'roastery2': 6}
-
-    shipping_cost_supplier_to_roastery = {
-        ('supplier1', 'roastery1'): 5, ('supplier1', 'roastery2'): 4,
-        ('supplier2', 'roastery1'): 6, ('supplier2', 'roastery2'): 3,
-        ('supplier3', 'roastery1'): 2, ('supplier3', 'roastery2'): 7
-    }
+    Args:
+        decision_keys (array-like): canonical decision keys (see decisions.py), shape (decisions, nodes) or (nodes,).
+        disruption_outcomes (array-like): True per disrupted node, shape (outcomes, nodes).
+            Nodes in network order (suppliers, then roasteries) in both arrays.
+        data (dict): coffee network data (see coffee_data.py); defaults to the experiment setting
+            (whose solves are cached across calls).
 
-    shipping_cost_roastery_to_customers = {
-        ('roastery1', 'customer1'): 5, ('roastery1', 'customer2'): 3,
-        ('roastery1', 'customer3'): 6, ('roastery2', 'customer1'): 4,
-        ('roastery2', 'customer2'): 5, ('roastery2', 'customer3'): 2
-    }
+    Returns:
+        np.ndarray: profit (rounded to whole COF$) per decision key and outcome, shape (decisions, outcomes)
+        (or (outcomes,) for a single decision key).
+    """
+    solver = _get_recourse_solver() if data is None else RecourseSolver(data, backend="scipy")
+    data = solver.data
+    num_s, num_r = len(solver.suppliers), len(solver.roasteries)
+    keys = np.asarray(decision_keys, dtype=int)
+    single_key = keys.ndim == 1
+    keys = np.atleast_2d(keys)
+    disrupted = np.atleast_2d(np.asarray(disruption_outcomes, dtype=bool))
+    if keys.shape[1] != num_s + num_r or disrupted.shape[1] != num_s + num_r:
+        raise ValueError(f"Decision keys and disruption outcomes need one column per node ({num_s + num_r})")
+    levels = [list(data['r_capacity'][r]) for r in solver.roasteries]
+    if keys[:, :num_s].min(initial=0) < 0 or keys[:, :num_s].max(initial=0) > 1 or keys[:, num_s:].min(initial=0) < 0 \
+            or keys[:, num_s:].max(initial=0) > min(len(r_levels) for r_levels in levels):
+        raise ValueError("Decision keys need 0/1 per supplier and 0 (not activated) or a level number per roastery")
+
+    # Capacity and fixed costs per supplier activation and roastery level (column 0: not activated)
+    s_capacity = np.array([data['s_capacity'][s] for s in solver.suppliers])
+    s_fixed_cost = np.array([data['fixed_supplier_cost'][s] for s in solver.suppliers])
+    r_capacity = np.array([[0] + [data['r_capacity'][r][lvl] for lvl in r_levels] for r, r_levels in zip(solver.roasteries, levels)])
+    r_fixed_cost = np.array([[0] + [data['fixed_roasting_cost'][r][lvl] for lvl in r_levels] for r, r_levels in zip(solver.roasteries, levels)])
+
+    # Distinct outcomes (at most 2^nodes), then available capacities (decisions x outcomes x nodes) and distinct states
+    patterns, pattern_index = np.unique(disrupted, axis=0, return_inverse=True)
+    s_available = (s_capacity * keys[:, :num_s])[:, None, :] * ~patterns[None, :, :num_s]
+    r_available = r_capacity[np.arange(num_r), keys[:, num_s:]][:, None, :] * ~patterns[None, :, num_s:]
+    states = np.concatenate([s_available, r_available], axis=2).reshape(-1, num_s + num_r)
+    unique_states, state_index = np.unique(states, axis=0, return_inverse=True)
+    contributions = np.array([solver.contribution(tuple(state[:num_s]), tuple(state[num_s:])) for state in unique_states.tolist()])
+
+    fixed_costs = keys[:, :num_s] @ s_fixed_cost + r_fixed_cost[np.arange(num_r), keys[:, num_s:]].sum(axis=1)
+    pattern_profits = data['fixed_income_bonuspool'] - fixed_costs[:, None] + contributions[state_index.reshape(len(keys), len(patterns))]
+    profits = np.round(pattern_profits[:, pattern_index.reshape(-1)], 0)
+    return profits[0] if single_key else profits
+
+def _build_deterministic_model(model, data=None):
+    """Add data, variables, objective and constraints of the deterministic model (without decisions and disruptions).
 
-    coffee_demand = {
-        'light': {'customer1': 20, 'customer2': 30, 'customer3': 40},
-        'dark': {'customer1': 20, 'customer2': 20, 'customer3': 100},
-    }
+    Args:
+        model (grb.Model): empty model.
+        data (dict): coffee network data (see coffee_data.py); defaults to the experiment setting.
 
-    selling_price = 30
+    Returns:
+        dict: node lists ("suppliers", "roasteries", "customers") and variables ("coffee_flow_light",
+        "coffee_flow_dark", "coffee_flow_raw", "roastery_activation", "supplier_activation").
+    """
+    # Supply chain data (the data the realized-profit table is hashed with, see realized_profit_table.py)
+    data = data if data is not None else get_coffee_network_data()
+    supplier_capacity = data['s_capacity']
+    roastery_capacity = data['r_capacity']
+    fixed_supplier_cost = data['fixed_supplier_cost']
+    fixed_roasting_cost = data['fixed_roasting_cost']
+    variable_roasting_cost_light = data['variable_roasting_cost_light']
+    variable_roasting_cost_dark = data['variable_roasting_cost_dark']
+    shipping_cost_supplier_to_roastery = data['shipping_cost_s_to_r']
+    shipping_cost_roastery_to_customers = data['shipping_cost_r_to_c']
+    coffee_demand = data['coffee_demand']
+    selling_price = data['selling_price']
 
     # Fixed income from existing bonus pool
-    fixed_income_bonuspool = 2210
+    fixed_income_bonuspool = data['fixed_income_bonuspool']
 
     suppliers = list(set(i[0] for i in shipping_cost_supplier_to_roastery.keys()))
     roasteries = list(set(i[0] for i in shipping_cost_roastery_to_customers.keys()))
@@ -65,10 +178,6 @@ def evaluate_deterministic(fixed_activation_decisions, specific_disruption_outco
     roasteries.sort()
     customers.sort()
 
-    # Create new environment and model
-    env = grb.Env(params={"OutputFlag": 0})
-    model = grb.Model(env=env)
-
     # Create Gurobi variables
     coffee_flow_light = model.addVars(roasteries, customers, vtype=grb.GRB.INTEGER, name="coffee_flow_light")
     coffee_flow_dark = model.addVars(roasteries, customers, vtype=grb.GRB.INTEGER, name="coffee_flow_dark")
@@ -118,7 +227,7 @@ def evaluate_deterministic(fixed_activation_decisions, specific_disruption_outco
     for r in roasteries:
         cl.append(model.addConstr(
             grb.quicksum(coffee_flow_light[r, c] + coffee_flow_dark[r, c] for c in customers if (r, c) in shipping_cost_roastery_to_customers.keys())
-            <= roastery_capacity[r] * (roastery_activation[r, 'low'] + 2 * roastery_activation[r, 'high']),
+            <= grb.quicksum(roastery_capacity[r][level] * roastery_activation[r, level] for level in ['low', 'high']),
             name=f"max_capacity_{r}"
         ))
 
@@ -146,35 +255,16 @@ def evaluate_deterministic(fixed_activation_decisions, specific_disruption_outco
         cl.append(model.addConstr(grb.quicksum(coffee_flow_raw[s, r] for r in roasteries if (s,r) in shipping_cost_supplier_to_roastery.keys())
                         <= supplier_activation[s] * supplier_capacity[s], name=f"supplier_activation_{s}"))
 
-    # Incorporate fixed user decisions and realized disruptions
-    for entity, decision in fixed_activation_decisions.items():
-        if entity in suppliers:
-            if decision == "activate":
-                model.addConstr(supplier_activation[entity] == 1, name=f"enforce_{entity}_choice")
-                if specific_disruption_outcome.get(entity, False):
-                    model.addConstr(
-                        grb.quicksum(coffee_flow_raw[entity, r] for r in roasteries if (entity, r) in shipping_cost_supplier_to_roastery) == 0,
-                        name=f"zero_flow_{entity}")
-            else:
-                model.addConstr(supplier_activation[entity] == 0, name=f"enforce_{entity}_choice")
-        
-        elif entity in roasteries:
-            if decision == "do not activate":
-                model.addConstr(roastery_activation[entity, 'low'] + roastery_activation[entity, 'high'] == 0, name=f"enforce_{entity}_choice")
-            else:
-                if decision == "activate (low)":
-                    model.addConstr(roastery_activation[entity, 'low'] == 1, name=f"enforce_{entity}_choice")
-                elif decision == "activate (high)":
-                    model.addConstr(roastery_activation[entity, 'high'] == 1, name=f"enforce_{entity}_choice")
-                if specific_disruption_outcome.get(entity, False):
-                    model.addConstr(
-                        grb.quicksum(coffee_flow_light[entity, c] + coffee_flow_dark[entity, c] for c in customers if (entity, c) in shipping_cost_roastery_to_customers) == 0,
-                        name=f"zero_flow_{entity}")
-
     # IF NEEDED, ADD NEW CONSTRAINT CODE HERE
 
-    # Solve model
     model.update()
+    return {"suppliers": suppliers, "roasteries": roasteries, "customers": customers,
+            "coffee_flow_light": coffee_flow_light, "coffee_flow_dark": coffee_flow_dark, "coffee_flow_raw": coffee_flow_raw,
+            "roastery_activation": roastery_activation, "supplier_activation": supplier_activation}
+
+def _solve_result(model):
+    """Solve model and get the rounded profit (or a status description); result as for evaluate_deterministic().
+    """
     model.optimize()
 
     status = model.Status
@@ -197,4 +287,125 @@ def evaluate_deterministic(fixed_activation_decisions, specific_disruption_outco
             """
         else:
             result = "Model Status:" + str(status)
-        return result
\ No newline at end of file
+        return result
+
+
+class DeterministicEvaluator():
+    """Deterministic model that is built once; decisions and disruptions are applied as variable bounds.
+
+    - enforced activation: LB = UB = 1 (supplier, chosen roastery level)
+    - not activated: UB = 0 (supplier, both roastery levels)
+    - disruption of an activated node: UB = 0 for its outgoing flows
+    Nodes without a decision stay free (optimized by the model), as in a newly built model.
+    """
+    def __init__(self, env=None, data=None):
+        """
+        Args:
+            env (grb.Env): Gurobi environment for exclusive use (one of the reserved evaluator envs until close() if None).
+            data (dict): coffee network data (see coffee_data.py); defaults to the experiment setting.
+        """
+        self.leased_env = env is None
+        self.env = _evaluator_envs.acquire() if env is None else env
+        self.model = grb.Model(env=self.env)
+        self.vars = _build_deterministic_model(self.model, data)
+
+        # Bounds without decisions and disruptions (binary activations, nonnegative flows)
+        self.all_vars = self.model.getVars()
+        self.free_lb = np.array(self.model.getAttr("LB", self.all_vars))
+        self.free_ub = np.array(self.model.getAttr("UB", self.all_vars))
+        self.supplier_activation = {s: var.index for s, var in self.vars["supplier_activation"].items()}
+        self.roastery_activation = {key: var.index for key, var in self.vars["roastery_activation"].items()}
+        # Outgoing flow variable indices per supplier/roastery (set to zero if the node is disrupted)
+        self.outgoing_flows = {s: [var.index for (s_, _), var in self.vars["coffee_flow_raw"].items() if s_ == s] for s in self.vars["suppliers"]}
+        for r in self.vars["roasteries"]:
+            self.outgoing_flows[r] = [var.index for flows in (self.vars["coffee_flow_light"], self.vars["coffee_flow_dark"])
+                                      for (r_, _), var in flows.items() if r_ == r]
+
+    def evaluate(self, fixed_activation_decisions, specific_disruption_outcome):
+        """Evaluate one deterministic scenario; arguments and result as for evaluate_deterministic().
+        """
+        lb, ub = self.free_lb.copy(), self.free_ub.copy()
+        supplier_activation, roastery_activation = self.supplier_activation, self.roastery_activation
+
+        for entity, decision in fixed_activation_decisions.items():
+            if entity in supplier_activation:
+                if decision == "activate":
+                    lb[supplier_activation[entity]] = 1
+                    if specific_disruption_outcome.get(entity, False):
+                        ub[self.outgoing_flows[entity]] = 0
+                else:
+                    ub[supplier_activation[entity]] = 0
+
+            elif entity in self.vars["roasteries"]:
+                if decision == "do not activate":
+                    ub[[roastery_activation[entity, 'low'], roastery_activation[entity, 'high']]] = 0
+                else:
+                    if decision == "activate (low)":
+                        lb[roastery_activation[entity, 'low']] = 1
+                    elif decision == "activate (high)":
+                        lb[roastery_activation[entity, 'high']] = 1
+                    if specific_disruption_outcome.get(entity, False):
+                        ub[self.outgoing_flows[entity]] = 0
+
+        # Bounds of all variables (i.e. also resetting those of the previous evaluation)
+        self.model.setAttr("LB", self.all_vars, lb.tolist())
+        self.model.setAttr("UB", self.all_vars, ub.tolist())
+        return _solve_result(self.model)
+
+    def close(self):
+        """Dispose the model and return a leased env to the reserved evaluator envs.
+        """
+        self.model.dispose()
+        if self.leased_env:
+            _evaluator_envs.release(self.env)
+            self.env = None
+
+# Evaluators for concurrent requests (created on first use);
+# one reserved env per evaluator, i.e. evaluators never wait for shared envs
+_evaluator_envs = env_pool.reserve(MAX_DETERMINISTIC_MODELS)
+evaluator_pool = ModelPool(DeterministicEvaluator, size=MAX_DETERMINISTIC_MODELS)
+
+def _parity_decisions():
+    """Get canonical and non-canonical decisions (partial, roasteries without level, other wordings) for check_backend_parity().
+    """
+    data = get_coffee_network_data()
+    suppliers, roasteries = list(data['s_capacity']), list(data['r_capacity'])
+    canonical = [decisions_from_key(key, suppliers, roasteries) for key in all_decision_keys(len(suppliers), len(roasteries))]
+    decisions_list = list(canonical)
+    # Decisions without one of the nodes (free node)
+    decisions_list += [{node: decision for node, decision in decisions.items() if node != missing}
+                       for decisions in canonical for missing in decisions]
+    decisions_list += [{}] + [{node: decision} for node, decision in canonical[-1].items()]
+    # Roasteries activated without a level, unknown wordings
+    decisions_list += [decisions | {r: "activate"} for decisions in canonical for r in roasteries]
+    decisions_list += [decisions | {suppliers[-1]: suppliers[-1]} for decisions in canonical[::9]]
+    return decisions_list
+
+def check_backend_parity(decisions_list=None):
+    """Compare the "scipy" with the "gurobi" backend of evaluate_deterministic() under all disruption outcomes (needs Gurobi).
+
+    Args:
+        decisions_list (list): decisions dicts to compare (default: all canonical decisions and non-canonical
+            variants, i.e. nodes without a decision, roasteries activated without a level, other wordings).
+
+    Returns:
+        list: (decisions, disruptions, scipy result, gurobi result) of all differing results.
+    """
+    data = get_coffee_network_data()
+    nodes = list(data['s_capacity']) + list(data['r_capacity'])
+    mismatches = []
+    with evaluator_pool.checkout() as evaluator:
+        for decisions in decisions_list if decisions_list is not None else _parity_decisions():
+            for pattern in itertools.product([False, True], repeat=len(nodes)):
+                disruptions = dict(zip(nodes, pattern))
+                scipy_result = _evaluate_with_recourse_solver(decisions, disruptions)
+                gurobi_result = evaluator.evaluate(decisions, disruptions)
+                if isinstance(gurobi_result, str) or abs(scipy_result - gurobi_result) > 0.5:
+                    mismatches.append((decisions, disruptions, scipy_result, gurobi_result))
+    return mismatches
+
+if __name__ == "__main__":
+    mismatches = check_backend_parity()
+    for decisions, disruptions, scipy_result, gurobi_result in mismatches[:10]:
+        print(f"{decisions}, disrupted {[node for node, disrupted in disruptions.items() if disrupted]}: scipy {scipy_result}, gurobi {gurobi_result}")
+    print(f"{len(mismatches)} differing results")
@@ -3,6 +3,9 @@
 from gurobipy import GRB
 import gurobipy as grb
 import numpy as np
+from llms_decision_support.python_files.artifact_cache import artifact_cache
+from llms_decision_support.python_files.env_pool import env_pool
+from llms_decision_support.python_files.scenarios import profit_occurrences
 
 # supply chain data
 s_capacity = {'supplier1': 250, 'supplier2': 100, 'supplier3': 200}
@@ -23,29 +26,24 @@ selling_price, fixed_income_bonuspool, num_scenarios = 30, 2210, 1000
 suppliers = s_capacity.keys()
 roasteries = r_capacity.keys()
 customers = coffee_demand['light'].keys()
-scen_num_range = range(num_scenarios)
 
-# disruption scenarios
-np.random.seed(42)
+# disruption scenarios (unique patterns; scenario_mode "sampled": seeded sample, "exact": all patterns)
 s_default_prob = {'supplier1': 0.3, 'supplier2': 0.0, 'supplier3': 0.0}
 r_default_prob = {'roastery1': 0.1, 'roastery2': 0.0}
-scenarios = [
-    ({s: np.random.rand() < s_default_prob[s] for s in suppliers},
-     {r: np.random.rand() < r_default_prob[r] for r in roasteries})
-    for _ in scen_num_range
-]
+scenario_mode = "sampled"
+scenarios, scenario_probs = artifact_cache.scenarios(s_default_prob, r_default_prob, scenario_mode=scenario_mode, num_scenarios=num_scenarios)
+scen_num_range = range(len(scenarios))
 
-# model setup
-env = grb.Env(params={"OutputFlag": 0})
-model = grb.Model(env=env)
+# model setup (env held by the code runner, see env_pool.held_env())
+model = grb.Model(env=env_pool.held_env())
 
 # 1st-stage vars
 r_activation = model.addVars(roasteries, ['low', 'high'], vtype=GRB.BINARY, name="r_activation")
 s_activation = model.addVars(suppliers, vtype=GRB.BINARY, name="s_activation")
 # 2nd-stage vars
-coffee_flow_raw = model.addVars(num_scenarios, suppliers, roasteries, vtype=GRB.INTEGER, name="coffee_flow_raw")
-coffee_flow_light = model.addVars(num_scenarios, roasteries, customers, vtype=GRB.INTEGER, name="coffee_flow_light")
-coffee_flow_dark = model.addVars(num_scenarios, roasteries, customers, vtype=GRB.INTEGER, name="coffee_flow_dark")
+coffee_flow_raw = model.addVars(len(scenarios), suppliers, roasteries, vtype=GRB.INTEGER, name="coffee_flow_raw")
+coffee_flow_light = model.addVars(len(scenarios), roasteries, customers, vtype=GRB.INTEGER, name="coffee_flow_light")
+coffee_flow_dark = model.addVars(len(scenarios), roasteries, customers, vtype=GRB.INTEGER, name="coffee_flow_dark")
 
 # fix activation helper function
 def fix_activation_decisions(fixed_s_activation, fixed_r_activation):
@@ -59,9 +57,9 @@ def fix_activation_decisions(fixed_s_activation, fixed_r_activation):
 contribution_per_scenario = {
     n: (
         grb.quicksum((coffee_flow_light[n, r, c] + coffee_flow_dark[n, r, c]) * selling_price for r, c in shipping_cost_r_to_c)
-        - sum((coffee_flow_light[n, r, c] + coffee_flow_dark[n, r, c]) * shipping_cost_r_to_c[r, c] for r, c in shipping_cost_r_to_c)
-        - sum(coffee_flow_raw[n, s, r] * shipping_cost_s_to_r[s, r] for s, r in shipping_cost_s_to_r)
-        - sum(
+        - grb.quicksum((coffee_flow_light[n, r, c] + coffee_flow_dark[n, r, c]) * shipping_cost_r_to_c[r, c] for r, c in shipping_cost_r_to_c)
+        - grb.quicksum(coffee_flow_raw[n, s, r] * shipping_cost_s_to_r[s, r] for s, r in shipping_cost_s_to_r)
+        - grb.quicksum(
             coffee_flow_light[n, r, c] * variable_roasting_cost_light[r] +
             coffee_flow_dark[n, r, c] * variable_roasting_cost_dark[r]
             for r, c in shipping_cost_r_to_c
@@ -70,10 +68,10 @@ contribution_per_scenario = {
     for n in scen_num_range
 }
 
-fixed_r_cost = sum(r_activation[r, lvl] * fixed_roasting_cost[r][lvl] for r in roasteries for lvl in ['low', 'high'])
-fixed_s_cost = sum(s_activation[s] * fixed_supplier_cost[s] for s in suppliers)
+fixed_r_cost = grb.quicksum(r_activation[r, lvl] * fixed_roasting_cost[r][lvl] for r in roasteries for lvl in ['low', 'high'])
+fixed_s_cost = grb.quicksum(s_activation[s] * fixed_supplier_cost[s] for s in suppliers)
 profit_per_scenario = {n: fixed_income_bonuspool + contribution_per_scenario[n] - fixed_r_cost - fixed_s_cost for n in scen_num_range}
-model.setObjective((1 / num_scenarios) * sum(profit_per_scenario[n] for n in scen_num_range), GRB.MAXIMIZE)
+model.setObjective(grb.quicksum(float(scenario_probs[n]) * profit_per_scenario[n] for n in scen_num_range), GRB.MAXIMIZE)
 
 # Constraints
 for r in roasteries:
@@ -81,19 +79,26 @@ for r in roasteries:
 for n, (s_defs, r_defs) in enumerate(scenarios):
     for r in roasteries:
         if r_defs[r]:
-            _=model.addConstr(sum(coffee_flow_light[n, r, c] + coffee_flow_dark[n, r, c] for c in customers) == 0)
-        _=model.addConstr(sum(coffee_flow_light[n, r, c] + coffee_flow_dark[n, r, c] for c in customers) <= sum(r_capacity[r][lvl] * r_activation[r, lvl] for lvl in r_capacity[r].keys()))
-        _=model.addConstr(sum(coffee_flow_raw[n, s, r] for s in suppliers) == sum(coffee_flow_light[n, r, c] + coffee_flow_dark[n, r, c] for c in customers))
+            _=model.addConstr(coffee_flow_light.sum(n, r, '*') + coffee_flow_dark.sum(n, r, '*') == 0)
+        _=model.addConstr(coffee_flow_light.sum(n, r, '*') + coffee_flow_dark.sum(n, r, '*') <= grb.quicksum(r_capacity[r][lvl] * r_activation[r, lvl] for lvl in r_capacity[r].keys()))
+        _=model.addConstr(coffee_flow_raw.sum(n, '*', r) == coffee_flow_light.sum(n, r, '*') + coffee_flow_dark.sum(n, r, '*'))
     for s in suppliers:
         if s_defs[s]:
-            _=model.addConstr(sum(coffee_flow_raw[n, s, r] for r in roasteries) == 0)
-        _=model.addConstr(sum(coffee_flow_raw[n, s, r] for r in roasteries) <= s_activation[s] * s_capacity[s])
+            _=model.addConstr(coffee_flow_raw.sum(n, s, '*') == 0)
+        _=model.addConstr(coffee_flow_raw.sum(n, s, '*') <= s_activation[s] * s_capacity[s])
     for c in customers:
-        _=model.addConstr(sum(coffee_flow_light[n, r, c] for r in roasteries) <= coffee_demand['light'][c])
-        _=model.addConstr(sum(coffee_flow_dark[n, r, c] for r in roasteries) <= coffee_demand['dark'][c])
-        
-# Solve initial model
-model.optimize()
+        _=model.addConstr(coffee_flow_light.sum(n, '*', c) <= coffee_demand['light'][c])
+        _=model.addConstr(coffee_flow_dark.sum(n, '*', c) <= coffee_demand['dark'][c])
+
+# best activations under risk for the model above (incl. changed data or added constraints); only call if the user asks for them
+def solve_stochastic_optimum():
+    for var in list(s_activation.values()) + list(r_activation.values()):
+        var.lb, var.ub = 0, 1
+    model.optimize()
+    decisions = {s: "activate" if s_activation[s].X > 0.5 else "do not activate" for s in suppliers}
+    for r in roasteries:
+        decisions[r] = next((f"activate ({lvl})" for lvl in ['low', 'high'] if r_activation[r, lvl].X > 0.5), "do not activate")
+    return {"decisions": decisions, "scenarios": profit_occurrences({n: profit_per_scenario[n].getValue() for n in scen_num_range}, scenario_probs), "ev": model.ObjVal}
 
 # The user has been provided with this activation setting below; change if user asks to evaluate different decisions(!)
 # If the user asks to check additional activation settings, activate enough supplier and
@@ -104,13 +109,8 @@ fix_activation_decisions(fixed_s_activation, fixed_r_activation)
 model.optimize()
 
 # Calculate share of unique profit occurrences
-def profit_occurrences(profit_dict):
-    counts = {v: list(profit_dict.values()).count(v) / len(profit_dict) for v in set(profit_dict.values())}
-    sorted_counts = sorted(counts.items(), key=lambda item: item[0], reverse=True)
-    return sorted_counts
-
-profit_probs = profit_occurrences({n: profit_per_scenario[n].getValue() for n in scen_num_range})
-formatted_scenarios = '; '.join([f"${key:,.0f}: {value:.0%}" for key, value in profit_probs])
+profit_probs = profit_occurrences({n: profit_per_scenario[n].getValue() for n in scen_num_range}, scenario_probs)
+formatted_scenarios = '; '.join([f"${key:,.0f}: {value:.0%}" for key, value in profit_probs.items()])
 activations = [f"{s}: {True}" for s in s_activation.keys() if s_activation[s].X > 0] + \
               [f"{r}: {lvl}" for r, lvl in r_activation.keys() if r_activation[r, lvl].X > 0]
 print(f"Optimization problem solved. Profit scenarios and probabilities: {formatted_scenarios}. Activations: {', '.join(activations)}")
\ No newline at end of file
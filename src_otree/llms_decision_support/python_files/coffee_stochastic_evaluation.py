@@ -1,99 +1,133 @@
 """This module is usable via code created by the LLM.
 (Information provided to LLM via helper functions documentation and in-context learning examples)
 """
+import contextlib
+import copy
 import gurobipy as grb
 import numpy as np
+import threading
+from llms_decision_support.python_files.artifact_cache import artifact_cache
+from llms_decision_support.python_files.benders import BendersSolver
+from llms_decision_support.python_files.coffee_data import apply_parameter_changes, get_coffee_network_data, network_data_hash
+from llms_decision_support.python_files.env_pool import env_pool
+from llms_decision_support.python_files.decisions import ROASTERY_LEVELS, activations_from_key, all_decision_keys, canonical_decision_key, decisions_from_key
+from llms_decision_support.python_files.evaluation_cache import EvaluationCache
+from llms_decision_support.python_files.extensive_form import constraint_rows, objective_coefficients, scenario_profits, solution_arrays, solution_decision_key
+from llms_decision_support.python_files.model_pool import ModelPool
+from llms_decision_support.python_files.recourse_solver import RecourseSolver
+from llms_decision_support.python_files.scenario_table import SCENARIOS_JSON_PATH
+from llms_decision_support.python_files.scenarios import distribution_statistics, profit_occurrences
+
+# Key of the optimum in optima_cache (in place of a decision key)
+OPTIMUM_KEY = "optimum"
+# Parameters that define the disruption scenarios (changes need a new model, see evaluate_what_if())
+SCENARIO_PARAMETERS = ['s_default_prob', 'r_default_prob', 'num_scenarios']
 
 class StochasticModel():
+    # Reference instance (node names, model hash); evaluations run on instances checked out of model_pool
     stoch_model = None
+    # Pool of model instances for concurrent evaluations (max. number of instances, see model_pool.py)
+    model_pool = None
+    model_pool_size = 4
+    # Gurobi envs reserved for the reference and pool instances (one per instance, see env_pool.reserve())
+    env_reservation = None
+    _model_pool_lock = threading.Lock()
+    # "sampled" reproduces the published experiment numbers; "exact" enumerates all disruption patterns
+    scenario_mode = "sampled"
+    # "decomposed" solves one small flow problem per distinct disruption pattern for fixed activations;
+    # "monolithic" re-optimizes the full extensive-form model
+    evaluation_engine = "decomposed"
+    # Optimal 1st stage (see stochastic_optimum()): "enumeration" evaluates all activation combinations;
+    # "benders" solves an L-shaped decomposition over the distinct disruption patterns (large networks and scenario counts)
+    optimization_method = "enumeration"
+    # Threads solving the flow problems of one Benders iteration
+    benders_workers = 1
+    # Backend of the per-scenario flow problems: "gurobi" or "scipy" (HiGHS; no Gurobi env/license needed)
+    solver_backend = "gurobi"
+    # Results of evaluate_stochastic per (model hash, canonical decisions)
+    results_cache = EvaluationCache(maxsize=512)
+    # Optimal 1st-stage decisions (see stochastic_optimum()) per (model hash, OPTIMUM_KEY); bounded, since
+    # every what-if, frontier or benchmark model adds an entry
+    optima_cache = EvaluationCache(maxsize=32)
+    # Exported results of the default setting (sampled scenarios), usable to pre-warm the cache
+    exported_results_path = SCENARIOS_JSON_PATH
     
-    def __init__(self):
+    def __init__(self, aggregate_scenarios=True, scenario_mode=None, data=None, solver_backend=None, envs=None):
+        """Set up the two-stage stochastic model (the extensive form is built on first use).
+
+        Args:
+            aggregate_scenarios (bool): if True, identical disruption patterns share one (weighted)
+                set of 2nd-stage variables and constraints; results are identical to the unaggregated model.
+            scenario_mode (str): "sampled" (seeded Monte Carlo, reproduces published numbers) or
+                "exact" (all disruption patterns with their true probabilities). Defaults to the class setting.
+            data (dict): coffee network data (see coffee_data.py); defaults to the experiment setting.
+            solver_backend (str): backend for the per-scenario flow problems. Defaults to the class setting.
+            envs (ModelPool): reserved envs to take the env of this instance from (see env_pool.reserve());
+                if None, a shared env is checked out of env_pool (or the env of the calling thread is reused).
+        """
         # supply chain data
-        s_capacity = {'supplier1': 250, 'supplier2': 100, 'supplier3': 200}
-        r_capacity = {'roastery1': {'low': 125, 'high': 250}, 'roastery2': {'low': 125, 'high': 250}}
-        fixed_supplier_cost = {'supplier1': 250, 'supplier2': 600, 'supplier3': 750}
-        fixed_roasting_cost = {'roastery1': {'low': 400, 'high': 600}, 'roastery2': {'low': 500, 'high': 700}}
-        variable_roasting_cost_light = {'roastery1': 3, 'roastery2': 5}
-        variable_roasting_cost_dark = {'roastery1': 5, 'roastery2': 6}
-        shipping_cost_s_to_r = {('supplier1', 'roastery1'): 5, ('supplier1', 'roastery2'): 4, 
-                                ('supplier2', 'roastery1'): 6, ('supplier2', 'roastery2'): 3, 
-                                ('supplier3', 'roastery1'): 2, ('supplier3', 'roastery2'): 7}
-        shipping_cost_r_to_c = {('roastery1', 'customer1'): 5, ('roastery1', 'customer2'): 3, 
-                                ('roastery1', 'customer3'): 6, ('roastery2', 'customer1'): 4, 
-                                ('roastery2', 'customer2'): 5, ('roastery2', 'customer3'): 2}
-        coffee_demand = {'light': {'customer1': 20, 'customer2': 30, 'customer3': 40}, 
-                        'dark': {'customer1': 20, 'customer2': 20, 'customer3': 100}}
-        selling_price, fixed_income_bonuspool, num_scenarios = 30, 2210, 1000
-        self.suppliers = s_capacity.keys()
-        suppliers = self.suppliers
-        self.roasteries = r_capacity.keys()
-        roasteries = self.roasteries
-        customers = coffee_demand['light'].keys()
-        self.scen_num_range = range(num_scenarios)
-        scen_num_range = self.scen_num_range
-
-        # disruption scenarios
-        np.random.seed(42)
-        s_default_prob = {'supplier1': 0.3, 'supplier2': 0.0, 'supplier3': 0.0}
-        r_default_prob = {'roastery1': 0.1, 'roastery2': 0.0}
-        scenarios = [
-            ({s: np.random.rand() < s_default_prob[s] for s in suppliers},
-            {r: np.random.rand() < r_default_prob[r] for r in roasteries})
-            for _ in scen_num_range
-        ]
-
-        # model setup
-        env = grb.Env(params={"OutputFlag": 0})
-        self.model = grb.Model(env=env)
-        model = self.model
-
-        # 1st-stage vars
-        self.r_activation = model.addVars(roasteries, ['low', 'high'], vtype=grb.GRB.BINARY, name="r_activation")
-        r_activation = self.r_activation
-        self.s_activation = model.addVars(suppliers, vtype=grb.GRB.BINARY, name="s_activation")
-        s_activation = self.s_activation
-        # 2nd-stage vars
-        coffee_flow_raw = model.addVars(num_scenarios, suppliers, roasteries, vtype=grb.GRB.INTEGER, name="coffee_flow_raw")
-        coffee_flow_light = model.addVars(num_scenarios, roasteries, customers, vtype=grb.GRB.INTEGER, name="coffee_flow_light")
-        coffee_flow_dark = model.addVars(num_scenarios, roasteries, customers, vtype=grb.GRB.INTEGER, name="coffee_flow_dark")
-
-        # Objective function
-        contribution_per_scenario = {
-            n: (
-                grb.quicksum((coffee_flow_light[n, r, c] + coffee_flow_dark[n, r, c]) * selling_price for r, c in shipping_cost_r_to_c)
-                - sum((coffee_flow_light[n, r, c] + coffee_flow_dark[n, r, c]) * shipping_cost_r_to_c[r, c] for r, c in shipping_cost_r_to_c)
-                - sum(coffee_flow_raw[n, s, r] * shipping_cost_s_to_r[s, r] for s, r in shipping_cost_s_to_r)
-                - sum(
-                    coffee_flow_light[n, r, c] * variable_roasting_cost_light[r] +
-                    coffee_flow_dark[n, r, c] * variable_roasting_cost_dark[r]
-                    for r, c in shipping_cost_r_to_c
-                )
-            )
-            for n in scen_num_range
-        }
+        self.data = data if data is not None else get_coffee_network_data()
+        data = self.data
+        self.suppliers = data['s_capacity'].keys()
+        self.roasteries = data['r_capacity'].keys()
+
+        # disruption scenarios (each unique scenario n occurs with probability scenario_probs[n])
+        self.scenario_mode = scenario_mode or StochasticModel.scenario_mode
+        self.scenarios, self.scenario_probs = artifact_cache.scenarios(
+            data['s_default_prob'], data['r_default_prob'], self.scenario_mode, data['num_scenarios'], seed=42, aggregate=aggregate_scenarios)
+        self.scen_num_range = range(len(self.scenarios))
+        # Identifies data and scenarios (i.e. everything that changes evaluation results)
+        self.model_hash = network_data_hash(data, scenario_mode=self.scenario_mode, seed=42)
+
+        # Gurobi env of this instance (leased on first use, see get_env() and close())
+        self.envs = envs
+        self.env = None
+        self._env_lease = None
 
-        fixed_r_cost = sum(r_activation[r, lvl] * fixed_roasting_cost[r][lvl] for r in roasteries for lvl in ['low', 'high'])
-        fixed_s_cost = sum(s_activation[s] * fixed_supplier_cost[s] for s in suppliers)
-        self.profit_per_scenario = {n: fixed_income_bonuspool + contribution_per_scenario[n] - fixed_r_cost - fixed_s_cost for n in scen_num_range}
-        profit_per_scenario = self.profit_per_scenario
-        model.setObjective((1 / num_scenarios) * sum(profit_per_scenario[n] for n in scen_num_range), grb.GRB.MAXIMIZE)
-
-        # Constraints
-        for r in roasteries:
-            _=model.addConstr(r_activation[r, 'low'] + r_activation[r, 'high'] <= 1)
-        for n, (s_defs, r_defs) in enumerate(scenarios):
-            for r in roasteries:
-                if r_defs[r]:
-                    _=model.addConstr(sum(coffee_flow_light[n, r, c] + coffee_flow_dark[n, r, c] for c in customers) == 0)
-                _=model.addConstr(sum(coffee_flow_light[n, r, c] + coffee_flow_dark[n, r, c] for c in customers) <= sum(r_capacity[r][lvl] * r_activation[r, lvl] for lvl in r_capacity[r].keys()))
-                _=model.addConstr(sum(coffee_flow_raw[n, s, r] for s in suppliers) == sum(coffee_flow_light[n, r, c] + coffee_flow_dark[n, r, c] for c in customers))
-            for s in suppliers:
-                if s_defs[s]:
-                    _=model.addConstr(sum(coffee_flow_raw[n, s, r] for r in roasteries) == 0)
-                _=model.addConstr(sum(coffee_flow_raw[n, s, r] for r in roasteries) <= s_activation[s] * s_capacity[s])
-            for c in customers:
-                _=model.addConstr(sum(coffee_flow_light[n, r, c] for r in roasteries) <= coffee_demand['light'][c])
-                _=model.addConstr(sum(coffee_flow_dark[n, r, c] for r in roasteries) <= coffee_demand['dark'][c])
+        # Per-scenario 2nd-stage solver for fixed activation decisions (solves are cached per capacity state)
+        self.solver_backend = solver_backend or StochasticModel.solver_backend
+        self.recourse_solver = RecourseSolver(data, backend=self.solver_backend, get_env=self.get_env)
+
+        # Extensive-form (Gurobi) model; see build_extensive_form()
+        self.model = None
+
+    def get_env(self):
+        """Get the Gurobi env of this instance (shared by the extensive form and the recourse solver).
+        """
+        if self.env is None:
+            if self.envs is not None:
+                self.env = self.envs.acquire()
+            else:
+                self._env_lease = contextlib.ExitStack()
+                self.env = self._env_lease.enter_context(env_pool.checkout())
+        return self.env
+
+    def close(self):
+        """Dispose the models and return the env (to the reserved envs or env_pool).
+        """
+        if self.model is not None:
+            self.model.dispose()
+            self.model = None
+        if self.env is not None:
+            if self.envs is not None:
+                self.envs.release(self.env)
+            else:
+                self._env_lease.close()
+            self.env, self._env_lease = None, None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def build_extensive_form(self):
+        """Build the extensive-form model with one set of 2nd-stage variables per (unique) scenario.
+        (Loaded from the artifact cache if built before.)
+        """
+        self.model, self.variables = artifact_cache.extensive_form(self.get_env(), self.data, self.scenarios, self.scenario_probs)
+        self.s_activation = self.variables['s_activation']
+        self.r_activation = self.variables['r_activation']
 
     @classmethod
     def evaluate_stochastic(cls, fixed_activation_decisions):
@@ -107,65 +141,318 @@ class StochasticModel():
                     - Suppliers: "activate" or "do not activate".
                     - Roasteries: "do not activate", "activate (low)", or "activate (high)".
                 Example: {"supplier1": "activate", [...],  "roastery2": "activate (low)"}
+                Missing nodes or roasteries activated without a level raise a ValueError.
 
         Return: dict
             - keys: all profit scenarios
             - values: their respective probabilities
         """
-        if cls.stoch_model == None:
-            cls.stoch_model = StochasticModel()
-
-        model = cls.stoch_model.model
-        suppliers = cls.stoch_model.suppliers
-        roasteries = cls.stoch_model.roasteries
-        scen_num_range = cls.stoch_model.scen_num_range
-        s_activation = cls.stoch_model.s_activation
-        r_activation = cls.stoch_model.r_activation
-        profit_per_scenario = cls.stoch_model.profit_per_scenario
-
-        # Solve initial model
-        model.optimize()
-
-        # The user has been provided with this activation setting; change if user asks to evaluate different decisions(!)
-        fixed_s_activation = {}
-        fixed_r_activation = {}
-
-        # Loop through the original dictionary and populate the new ones
-        for key, value in fixed_activation_decisions.items():
-            if key in suppliers:
-                # Map supplier activation status
-                fixed_s_activation[key] = 1 if value == 'activate' else 0
-            elif key in roasteries:
-                # Initialize default values for roastery
-                fixed_r_activation[f"{key}_low"] = 0
-                fixed_r_activation[f"{key}_high"] = 0
-                if 'high' in value:
-                    fixed_r_activation[f"{key}_high"] = 1
-                elif 'low' in value:
-                    fixed_r_activation[f"{key}_low"] = 1
-
-        # fix activation helper function
-        def fix_activation_decisions(fixed_s_activation, fixed_r_activation):
-            for s, act in fixed_s_activation.items():
-                s_activation[s].lb = s_activation[s].ub = act
-            for r, act in fixed_r_activation.items():
-                roastery, level = r.split('_')
-                r_activation[roastery, level].lb = r_activation[roastery, level].ub = act
-
-        fix_activation_decisions(fixed_s_activation, fixed_r_activation)
-        model.optimize()
-
-        # Calculate share of unique profit occurrences
-        def profit_occurrences(profit_dict):
-            counts = {v: list(profit_dict.values()).count(v) / len(profit_dict) for v in set(profit_dict.values())}
-            sorted_counts = sorted(counts.items(), key=lambda item: item[0], reverse=True)
-            return {k: v for k, v in sorted_counts}
-
-        profit_probs = profit_occurrences({n: profit_per_scenario[n].getValue() for n in scen_num_range})
-        result = profit_probs
+        stoch_model = cls.get_reference_model()
+
+        # Normalize decisions (different wordings map to the same key)
+        decision_key = canonical_decision_key(fixed_activation_decisions, stoch_model.suppliers, stoch_model.roasteries)
+        result = cls.results_cache.get(stoch_model.model_hash, decision_key)
+        if result is None:
+            with cls.model_pool.checkout() as model_instance:
+                result = model_instance.compute_profit_distribution(decision_key)
+        result = dict(result)
         
         return result
 
+    @classmethod
+    def evaluate_stochastic_many(cls, decisions_list="all"):
+        """
+        Use this function (instead of calling evaluate_stochastic in a loop) if the user asks to
+        compare or rank several decisions under risk, e.g. "top 3 decisions".
+        
+        Parameters:
+            decisions_list : list of dicts or "all"
+                Activation decisions in the format of evaluate_stochastic, or "all" for all combinations.
+
+        Return: list of dicts (in the order of decisions_list), each with
+            - "decisions": activation decisions (dict)
+            - "scenarios": all profit scenarios and their probabilities (dict)
+            - "ev": expected profit, "sd": standard deviation, "cv": coefficient of variation (sd / ev)
+        """
+        stoch_model = cls.get_reference_model()
+        suppliers, roasteries = stoch_model.suppliers, stoch_model.roasteries
+
+        if isinstance(decisions_list, str) and decisions_list == "all":
+            decision_keys = all_decision_keys(len(suppliers), len(roasteries))
+        else:
+            decision_keys = [canonical_decision_key(decisions, suppliers, roasteries) for decisions in decisions_list]
+
+        with cls.model_pool.checkout() as model_instance:
+            return model_instance.evaluate_decision_keys(decision_keys)
+
+    @classmethod
+    def get_stochastic_optimum(cls):
+        """
+        Use this function if the user asks for the best (max. expected profit) activation decisions under risk.
+        The optimum is computed once and then cached.
+
+        Return: dict with
+            - "decisions": optimal activation decisions (dict)
+            - "scenarios": all profit scenarios and their probabilities (dict)
+            - "ev": expected profit, "sd": standard deviation, "cv": coefficient of variation (sd / ev)
+        """
+        stoch_model = cls.get_reference_model()
+        optimum = cls.optima_cache.get(stoch_model.model_hash, OPTIMUM_KEY)
+        if optimum is None:
+            with cls.model_pool.checkout() as model_instance:
+                return model_instance.stochastic_optimum()
+        # Copy, so callers (e.g. LLM code) cannot change the cached optimum
+        return copy.deepcopy(optimum)
+
+    @classmethod
+    def evaluate_what_if(cls, parameter_changes, fixed_activation_decisions=None):
+        """
+        Use this function if the user asks what happens if parameters of the network change
+        (capacities, costs, selling price, demand, bonus pool or default probabilities), e.g.
+        "What if supplier2 could deliver 150 units?" or "What if the selling price drops to 28?".
+        The parameters of the model itself are not changed permanently.
+
+        Parameters:
+            parameter_changes : dict
+                Changed parameters only, with the names and keys used in the source code.
+                Example: {"s_capacity": {"supplier2": 150}, "selling_price": 28,
+                          "shipping_cost_s_to_r": {("supplier1", "roastery2"): 6},
+                          "r_capacity": {"roastery1": {"high": 300}}, "coffee_demand": {"dark": {"customer3": 80}}}
+            fixed_activation_decisions : dict or None
+                Activation decisions in the format of evaluate_stochastic,
+                or None to get the best (max. expected profit) activation decisions under the changed parameters.
+
+        Return: dict with
+            - "decisions": evaluated (or optimal) activation decisions (dict)
+            - "scenarios": all profit scenarios and their probabilities (dict)
+            - "ev": expected profit, "sd": standard deviation, "cv": coefficient of variation (sd / ev)
+        """
+        stoch_model = cls.get_reference_model()
+        decision_key = None
+        if fixed_activation_decisions is not None:
+            decision_key = canonical_decision_key(fixed_activation_decisions, stoch_model.suppliers, stoch_model.roasteries)
+
+        changed_data = apply_parameter_changes(stoch_model.data, parameter_changes)
+        if any(changed_data[key] != stoch_model.data[key] for key in SCENARIO_PARAMETERS):
+            # Other disruption scenarios: private instance for the changed data (not shared with other threads)
+            with StochasticModel(scenario_mode=stoch_model.scenario_mode, data=changed_data) as what_if_model:
+                if decision_key is None:
+                    return dict(what_if_model.stochastic_optimum())
+                return what_if_model.evaluate_decision_keys([decision_key])[0]
+
+        with cls.model_pool.checkout() as model_instance:
+            return model_instance.what_if(parameter_changes, decision_key)
+
+    @classmethod
+    def get_reference_model(cls):
+        """Get the reference model instance (created on first use, together with the model pool).
+
+        The reference instance is only read (node names, model hash); evaluations check out a pool instance.
+
+        Returns:
+            StochasticModel: reference instance.
+        """
+        with cls._model_pool_lock:
+            if cls.stoch_model is None:
+                cls.env_reservation = env_pool.reserve(cls.model_pool_size)
+                cls.stoch_model = StochasticModel(envs=cls.env_reservation)
+                cls.model_pool = ModelPool(lambda: StochasticModel(envs=cls.env_reservation), size=cls.model_pool_size,
+                                           instances=[cls.stoch_model])
+        return cls.stoch_model
+
+    def evaluate_decision_keys(self, decision_keys):
+        """Evaluate canonical decisions with distribution statistics.
+
+        Args:
+            decision_keys (list): canonical decisions (see decisions.py).
+
+        Returns:
+            list: dicts with "decisions", "scenarios", "ev", "sd" and "cv" (in the order of decision_keys).
+        """
+        return [self._result(decision_key, self.profit_distribution(decision_key)) for decision_key in decision_keys]
+
+    def stochastic_optimum(self):
+        """Get the (cached) optimal 1st-stage decisions of this model.
+
+        With the "enumeration" method, all activation combinations are evaluated with fixed activations
+        (cheap 2nd-stage solves); with "benders", an L-shaped decomposition (see benders.py) finds the
+        optimal activations. Neither needs a solve of the free extensive-form model.
+
+        Returns:
+            dict: "decisions", "scenarios", "ev", "sd" and "cv" of the max. expected profit decisions (a copy of the cached optimum).
+        """
+        optimum = self.optima_cache.get(self.model_hash, OPTIMUM_KEY)
+        if optimum is None:
+            if self.optimization_method == "benders":
+                benders_solver = BendersSolver(self.data, self.scenarios, self.scenario_probs, workers=self.benders_workers)
+                decision_key = benders_solver.solve(self.get_env())["decision_key"]
+                optimum = self._result(decision_key, self.profit_distribution(decision_key))
+            else:
+                results = self.evaluate_decision_keys(all_decision_keys(len(self.suppliers), len(self.roasteries)))
+                optimum = max(results, key=lambda result: result["ev"])
+            self.optima_cache.put(self.model_hash, OPTIMUM_KEY, optimum)
+        return copy.deepcopy(optimum)
+
+    def profit_distribution(self, decision_key):
+        """Get the (cached) profit distribution of canonical decisions.
+
+        Args:
+            decision_key (tuple): canonical decisions (see decisions.py).
+
+        Returns:
+            dict: profit scenarios and their probabilities (shared with the cache; do not modify).
+        """
+        cached_result = self.results_cache.get(self.model_hash, decision_key)
+        if cached_result is not None:
+            return cached_result
+        return self.compute_profit_distribution(decision_key)
+
+    def compute_profit_distribution(self, decision_key):
+        """Compute the profit distribution of canonical decisions (without cache lookup) and cache it.
+        """
+        fixed_s_activation, fixed_r_activation = activations_from_key(decision_key, self.suppliers, self.roasteries)
+
+        if self.evaluation_engine == "decomposed":
+            # Activations are fixed, i.e. every scenario is an independent flow problem
+            profit_values = self.recourse_solver.profit_per_scenario(fixed_s_activation, fixed_r_activation, self.scenarios)
+        else:
+            if self.model is None:
+                self.build_extensive_form()
+            # No solve of the free model needed (see stochastic_optimum())
+            self.fix_activation_decisions(fixed_s_activation, fixed_r_activation)
+            self.model.optimize()
+            profit_values = scenario_profits(self.variables)
+
+        # Calculate share of unique profit occurrences (weighted by scenario probabilities)
+        profit_probs = profit_occurrences(profit_values, self.scenario_probs)
+        self.results_cache.put(self.model_hash, decision_key, profit_probs)
+        return profit_probs
+
+    def what_if(self, parameter_changes, decision_key=None):
+        """Solve the extensive form with changed parameters, applied in place and reverted afterwards.
+
+        Capacities are coefficients of the activation variables (chgCoeff), demands are right-hand
+        sides (RHS), and costs, the selling price and the bonus pool enter the objective (Obj, ObjCon),
+        so the model does not need to be rebuilt.
+
+        Args:
+            parameter_changes (dict): changed data entries (see apply_parameter_changes()); the disruption
+                setting (SCENARIO_PARAMETERS) must stay unchanged.
+            decision_key (tuple): canonical decisions to evaluate; None to optimize the activations.
+
+        Returns:
+            dict: "decisions", "scenarios", "ev", "sd" and "cv" under the changed parameters.
+        """
+        data, changed_data = self.data, apply_parameter_changes(self.data, parameter_changes)
+        if any(changed_data[key] != data[key] for key in SCENARIO_PARAMETERS):
+            raise ValueError(f"Changes of {SCENARIO_PARAMETERS} need new scenarios (use StochasticModel.evaluate_what_if)")
+        # Results with changed parameters are cached like results of a model built from the changed data
+        changed_model_hash = network_data_hash(changed_data, scenario_mode=self.scenario_mode, seed=42)
+        if decision_key is not None:
+            cached_result = self.results_cache.get(changed_model_hash, decision_key)
+            if cached_result is not None:
+                return self._result(decision_key, cached_result)
+
+        if self.model is None:
+            self.build_extensive_form()
+        model, x = self.model, self.variables['x']
+        constrs = model.getConstrs()
+        rows = constraint_rows(data, len(self.scenarios))
+
+        # Capacity coefficients (constraint, variable, original value, changed value) of changed nodes only
+        coefficients = []
+        for i, s in enumerate(self.suppliers):
+            if changed_data['s_capacity'][s] != data['s_capacity'][s]:
+                coefficients += [(constrs[row], self.s_activation[s], -data['s_capacity'][s], -changed_data['s_capacity'][s])
+                                 for row in rows['s_capacity'][:, i]]
+        for i, r in enumerate(self.roasteries):
+            for lvl in ROASTERY_LEVELS:
+                if changed_data['r_capacity'][r][lvl] != data['r_capacity'][r][lvl]:
+                    coefficients += [(constrs[row], self.r_activation[r, lvl], -data['r_capacity'][r][lvl], -changed_data['r_capacity'][r][lvl])
+                                     for row in rows['r_capacity'][:, i]]
+        demand_constrs = [constrs[row] for row in np.hstack([rows['demand_light'], rows['demand_dark']]).reshape(-1)]
+        customers = list(data['coffee_demand']['light'])
+        demand = [changed_data['coffee_demand'][kind][c] for kind in ['light', 'dark'] for c in customers] * len(self.scenarios)
+        objective, profit_matrix = objective_coefficients(changed_data, self.scenario_probs)
+        first_stage = list(self.s_activation.values()) + list(self.r_activation.values())
+
+        original_demand = model.getAttr("RHS", demand_constrs)
+        original_objective, original_objective_constant = x.Obj, model.ObjCon
+        original_lb, original_ub = model.getAttr("LB", first_stage), model.getAttr("UB", first_stage)
+        try:
+            for constr, var, _, value in coefficients:
+                model.chgCoeff(constr, var, value)
+            model.setAttr("RHS", demand_constrs, demand)
+            x.Obj = objective
+            model.ObjCon = changed_data['fixed_income_bonuspool'] * sum(float(p) for p in self.scenario_probs)
+            if decision_key is None:
+                model.setAttr("LB", first_stage, [0] * len(first_stage))
+                model.setAttr("UB", first_stage, [1] * len(first_stage))
+            else:
+                self.fix_activation_decisions(*activations_from_key(decision_key, self.suppliers, self.roasteries))
+            model.optimize()
+            if model.Status != grb.GRB.OPTIMAL:
+                raise RuntimeError(f"What-if model not solved to optimality (status {model.Status})")
+
+            solution = np.round(x.X)
+            profit_values = profit_matrix @ solution + changed_data['fixed_income_bonuspool']
+            if decision_key is None:
+                decision_key = solution_decision_key(solution_arrays(self.variables, data, solution))
+        finally:
+            # Revert to the original parameters (the model is shared by later evaluations)
+            for constr, var, value, _ in coefficients:
+                model.chgCoeff(constr, var, value)
+            model.setAttr("RHS", demand_constrs, original_demand)
+            x.Obj = original_objective
+            model.ObjCon = original_objective_constant
+            model.setAttr("LB", first_stage, original_lb)
+            model.setAttr("UB", first_stage, original_ub)
+            model.update()
+
+        profit_probs = profit_occurrences(profit_values, self.scenario_probs)
+        self.results_cache.put(changed_model_hash, decision_key, profit_probs)
+        return self._result(decision_key, profit_probs)
+
+    def _result(self, decision_key, profit_probs):
+        ev, sd, cv = distribution_statistics(profit_probs)
+        return {
+            "decisions": decisions_from_key(decision_key, self.suppliers, self.roasteries),
+            "scenarios": dict(profit_probs),
+            "ev": ev, "sd": sd, "cv": cv,
+        }
+
+    def fix_activation_decisions(self, fixed_s_activation, fixed_r_activation):
+        """Fix the 1st-stage variables of the extensive form.
+
+        Args:
+            fixed_s_activation (dict): 0/1 per supplier, e.g. {'supplier1': 1, ...}.
+            fixed_r_activation (dict): 0/1 per roastery level, e.g. {'roastery1_low': 0, 'roastery1_high': 1, ...}.
+        """
+        for s, act in fixed_s_activation.items():
+            self.s_activation[s].lb = self.s_activation[s].ub = act
+        for r, act in fixed_r_activation.items():
+            roastery, level = r.split('_')
+            self.r_activation[roastery, level].lb = self.r_activation[roastery, level].ub = act
+
+    @classmethod
+    def prewarm_cache(cls, path=None):
+        """Fill the results cache from the exported scenarios and probabilities file.
+
+        Only applies if the current model matches the exported setting (default data, sampled scenarios).
+
+        Args:
+            path (str): path to scenarios_and_probabilities.json; defaults to the data files location.
+
+        Returns:
+            int: number of cached results added.
+        """
+        stoch_model = cls.get_reference_model()
+        exported_model_hash = network_data_hash(get_coffee_network_data(), scenario_mode="sampled", seed=42)
+        if stoch_model.model_hash != exported_model_hash:
+            return 0
+        return cls.results_cache.prewarm_from_json(
+            exported_model_hash, path or cls.exported_results_path, len(stoch_model.suppliers))
+
 # Example
 # fixed_activation_decisions = {'supplier1': 'activate', 'supplier2': 'do not activate', 'supplier3': 'activate', 'roastery1': 'activate (low)', 'roastery2': 'activate (high)'}
 # profits_and_probs = StochasticModel.evaluate_stochastic(fixed_activation_decisions)
@@ -1,11 +1,36 @@
 from otree.api import *
 from otree.api import BaseConstants
 from autogen import config_list_from_json 
-import os
 import json
 from pathlib import Path
 import importlib
 import numpy as np
+from llms_decision_support.python_files.lazy_constants import LazyConstant
+from llms_decision_support.python_files.scenario_table import ScenarioProbsView
+
+def _load_openai_api_key():
+    return config_list_from_json(env_or_file="llms_decision_support/api_keys/OAI_CONFIG_LIST")[0]["api_key"]
+
+def _load_src_code_stoch():
+    with open(C.code_path_stoch, "r") as f:
+        return f.read()
+
+def _load_example_qa():
+    try:
+        with open("llms_decision_support/data_files/icl_questions_llms_decision_support.json", 'r') as f:
+            return json.dumps(json.load(f))
+    except:
+        return ""
+
+def _load_helper_doc():
+    try:
+        with open("llms_decision_support/data_files/helper_doc.txt", 'r') as f:
+            return f.read()
+    except:
+        return ""
+
+def _import_app_module():
+    return importlib.import_module(C.NAME_IN_URL)
 
 class C(BaseConstants):
     NAME_IN_URL = 'llms_decision_support'
@@ -26,39 +51,27 @@ class C(BaseConstants):
     CUSTOMERS = ["customer1", "customer2", "customer3"]
 
     FLAG_RANDOM_DISRUPTIONS = False
-    FLAG_CALCULATE_PROVIDED_SOLUTION = False
     ENABLE_REMINDER_POPUP = False
     
     # LLM settings and relevant data
     FLAG_LLM_ACTIVE = True
     FAILED_ANSWER = "A technical error occurred. Please try again."
 
-    # Load (private) OpenAI API key (needs to be put in a separate file named OAI_CONFIG_LIST in this json format: [{"api_key": "sk-xxxx..."}])
-    openai_api_key = config_list_from_json(
-        env_or_file="llms_decision_support/api_keys/OAI_CONFIG_LIST",
-    )
-    os.environ["OPENAI_API_KEY"] = openai_api_key[0]["api_key"]
+    # Resources below are loaded on first access and cached (no file I/O at import; see lazy_constants.py and preload_constants())
+    # (Private) OpenAI API key (needs to be put in a separate file named OAI_CONFIG_LIST in this json format: [{"api_key": "sk-xxxx..."}])
+    OPENAI_API_KEY = LazyConstant(_load_openai_api_key)
 
-    # Get the source code from a local file in the same directory
+    # Source code of the stochastic model (from a local file in the same directory)
     code_path_stoch = Path(__file__).with_name("coffee_stochastic.py")
-    SRC_CODE_STOCH = open(code_path_stoch, "r").read()
+    SRC_CODE_STOCH = LazyConstant(_load_src_code_stoch)
 
-    # Get example questions for in-context learning (i.e. add to prompt)
-    try:
-        with open("llms_decision_support/data_files/icl_questions_llms_decision_support.json", 'r') as f:
-            icl_qs = json.load(f)
-            EXAMPLE_QA = json.dumps(icl_qs)
-    except:
-        EXAMPLE_QA = ""
+    # Example questions for in-context learning (i.e. add to prompt)
+    EXAMPLE_QA = LazyConstant(_load_example_qa)
 
-    # Get helper documentation
-    try:
-        with open("llms_decision_support/data_files/helper_doc.txt", 'r') as f:
-            HELPER_DOC = f.read()
-    except:
-        HELPER_DOC = ""
+    # Helper documentation
+    HELPER_DOC = LazyConstant(_load_helper_doc)
 
-    MODULE = importlib.import_module(NAME_IN_URL)
+    MODULE = LazyConstant(_import_app_module)
 
     # PAYOFF DATA
     if CURRENCY == "EUR":
@@ -113,46 +126,20 @@ class C(BaseConstants):
     # 000001 added/subtracted to force rounding up (otherwise, sum is not 100% for this example when rounding to percentages with 0 decimal digits)
     # (numpy uses "banker's rounding", i.e. .5 figures are rounded up (down) if they are odd (even))
     # => we only have one .5 case (i.e. 0.285 or 28.5%) so it does not cancel out...
+    # Non-dominated (EV, SD) decisions of the stochastic model; after changing the network data, regenerate with
+    # python -m llms_decision_support.python_files.efficient_frontier (run from src_otree)
+    # Ids are stored in Player.p2_decisions. Data note: sessions before the choices carried their decision strings
+    # mapped id 3 to "___S2_S3___R1-l_R2-h" (a copy of id 4) on the Part 2 outcome pages (image, comparison with Part 1),
+    # although participants chose it by the EV/SD/scenarios of "S1____S3___R1-l_R2-h" (shown unchanged since)
     ROUND = 0.000000001
     CUSTOM_TEST_CHOICES = [
-        {'id': 1, 'ev': '$4,253', "cv": "29%", "sd": "$1,242", "scenarios": {4800: 0.613-ROUND, 4380: 0.285+ROUND, 610: 0.102}},
-        {'id': 2, 'ev': "$4,250", "cv": "16%", "sd": "$678", "scenarios": {4690: 0.613-ROUND, 3925: 0.285+ROUND, 2600: 0.078, 2225: 0.024}},
-        {'id': 3, 'ev': "$4,208", "cv": "9%", "sd": "$385", "scenarios": {4490: 0.613-ROUND, 4110: 0.078, 3725: 0.285+ROUND, 3050: 0.024}},
-        {'id': 4, 'ev': "$4,148", "cv": "6%", "sd": "$228", "scenarios": {4225: 0.898, 3470: 0.102}},
-        {'id': 5, 'ev': "$3,938", "cv": "4%", "sd": "$151", "scenarios": {3990: 0.613-ROUND, 3975: 0.285+ROUND, 3610: 0.078, 3220: 0.024}},
-        {'id': 6, 'ev': "$3,870", "cv": "0%", "sd": "$0", "scenarios": {3870: 1.0}},
+        {'id': 1, 'ev': '$4,253', "cv": "29%", "sd": "$1,242", "scenarios": {4800: 0.613-ROUND, 4380: 0.285+ROUND, 610: 0.102}, 'decisions': "S1____S3___R1-h_____"},
+        {'id': 2, 'ev': "$4,250", "cv": "16%", "sd": "$678", "scenarios": {4690: 0.613-ROUND, 3925: 0.285+ROUND, 2600: 0.078, 2225: 0.024}, 'decisions': "S1____S3___R1-l_R2-l"},
+        {'id': 3, 'ev': "$4,208", "cv": "9%", "sd": "$385", "scenarios": {4490: 0.613-ROUND, 4110: 0.078, 3725: 0.285+ROUND, 3050: 0.024}, 'decisions': "S1____S3___R1-l_R2-h"},
+        {'id': 4, 'ev': "$4,148", "cv": "6%", "sd": "$228", "scenarios": {4225: 0.898, 3470: 0.102}, 'decisions': "___S2_S3___R1-l_R2-h"},
+        {'id': 5, 'ev': "$3,938", "cv": "4%", "sd": "$151", "scenarios": {3990: 0.613-ROUND, 3975: 0.285+ROUND, 3610: 0.078, 3220: 0.024}, 'decisions': "S1_S2_S3___R1-l_R2-h"},
+        {'id': 6, 'ev': "$3,870", "cv": "0%", "sd": "$0", "scenarios": {3870: 1.0}, 'decisions': "___S2_S3________R2-h"},
     ]
 
-    try:
-        with open("llms_decision_support/data_files/scenarios_and_probabilities.json", 'r') as f:
-            s_and_ps_dict = json.load(f)
-    except:
-        pass
-    
-    def round_shares(shares):
-        # total = sum(shares.values())
-        rounded_shares = {k: round(v, 2) for k, v in shares.items()}  # Initial rounding
-        remainder = round(1.00 - sum(rounded_shares.values()), 2)  # Compute remainder
-
-        # Compute decimal remainders for ranking
-        remainders = sorted(shares.keys(), key=lambda k: shares[k] - rounded_shares[k], reverse=True)
-
-        # Distribute the remainder (add or subtract 0.01 to highest remainders)
-        for i in range(int(remainder * 100)):  # Convert to cent units
-            rounded_shares[remainders[i]] += 0.01  # Adjust top remainders first
-
-        return rounded_shares
-
-    # Transform values into nested dictionaries
-    SCENARIOS_PROBS_DICT = {}
-    for key, value in s_and_ps_dict.items():
-        # Split by semicolon to get multiple key-value pairs
-        nested_items = value.split("; ")
-        
-        # Convert to dictionary (splitting each "key: value" pair)
-        nested_dict = {int(k.strip()): float(v) for k, v in (item.split(": ") for item in nested_items)}
-        
-        nested_dict = round_shares(nested_dict)
-        
-        # Store in the transformed dictionary
-        SCENARIOS_PROBS_DICT[key] = nested_dict
\ No newline at end of file
+    # {decisions string: {profit: probability (rounded to whole percent)}}; read lazily from the exported scenario table
+    SCENARIOS_PROBS_DICT = ScenarioProbsView(num_suppliers=len(SUPPLIERS))
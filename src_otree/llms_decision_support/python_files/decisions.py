@@ -0,0 +1,138 @@
+"""Canonical representation of activation decisions.
+
+Decisions arrive in various wordings (from the LLM, the decision page or the data files).
+They are normalized into a canonical key: one integer per node in network order,
+with suppliers 0 (do not activate) / 1 (activate) and roasteries 0 (do not activate) / 1 (low) / 2 (high).
+
+A key needs a decision for every node (as documented for the LLM, see data_files/helper_doc.txt), so
+evaluate_stochastic reads some decisions differently than before canonical keys were introduced
+(where only exactly "activate" activated a supplier, unmentioned nodes were optimized and a roastery
+activated without a level was not activated):
+- a node name as supplier value (e.g. 'supplier3': 'supplier3' in the ICL example) and other activating
+  wordings ("Activate", "yes", True, ...) now activate the supplier (formerly: not activated)
+- nodes that are not mentioned, roasteries activated without a level and unknown values now raise a
+  ValueError, which the LLM gets as error message of its code
+Results recorded for logged answers with such decisions therefore differ from a re-evaluation.
+evaluate_deterministic() (realized profits, not offered to the LLM) keeps its own reading, where nodes
+without a decision and roasteries without a level are optimized.
+"""
+import itertools
+
+ROASTERY_LEVELS = ['low', 'high']
+
+_NOT_ACTIVATED = {"do not activate", "don't activate", "dont activate", "not activate", "not activated",
+                  "deactivate", "deactivated", "inactive", "off", "no", "false", "0", "none", ""}
+_ACTIVATED = {"activate", "activated", "active", "on", "yes", "true", "1"}
+
+def _normalize_supplier(node, value):
+    if isinstance(value, (bool, int, float)):
+        return int(bool(value))
+    value_str = str(value).strip().lower()
+    if value_str in _NOT_ACTIVATED:
+        return 0
+    # A node name as value (e.g. 'supplier3': 'supplier3') is read as activation of that node
+    # (changed behavior, formerly "do not activate"; see module docstring)
+    if value_str in _ACTIVATED or value_str == node.lower():
+        return 1
+    raise ValueError(f"Unknown decision '{value}' for {node} (use 'activate' or 'do not activate')")
+
+def _normalize_roastery(node, value):
+    if isinstance(value, (bool, int, float)) and not value:
+        return 0
+    value_str = str(value).strip().lower()
+    if value_str in _NOT_ACTIVATED:
+        return 0
+    if 'high' in value_str:
+        return 2
+    if 'low' in value_str:
+        return 1
+    if value_str in _ACTIVATED:
+        raise ValueError(f"Decision '{value}' for {node} lacks a level (use 'activate (low)' or 'activate (high)')")
+    raise ValueError(f"Unknown decision '{value}' for {node} (use 'do not activate', 'activate (low)' or 'activate (high)')")
+
+def canonical_decision_key(fixed_activation_decisions, suppliers, roasteries):
+    """Normalize activation decisions into a canonical key.
+
+    Args:
+        fixed_activation_decisions (dict): decision per node, e.g. {"supplier1": "activate", ..., "roastery2": "activate (low)"}.
+            Every node needs a decision (node names are case-insensitive).
+        suppliers (iterable): supplier names in network order.
+        roasteries (iterable): roastery names in network order.
+
+    Returns:
+        tuple: 0/1 per supplier followed by 0/1/2 (none/low/high) per roastery.
+
+    Raises:
+        ValueError: for unknown or missing nodes, unknown decisions and roasteries activated without a level.
+    """
+    suppliers, roasteries = list(suppliers), list(roasteries)
+    decisions = {str(node).strip().lower(): value for node, value in fixed_activation_decisions.items()}
+    unknown_nodes = set(decisions) - {n.lower() for n in suppliers + roasteries}
+    if unknown_nodes:
+        raise ValueError(f"Unknown nodes in decisions: {sorted(unknown_nodes)}")
+    missing_nodes = [n for n in suppliers + roasteries if n.lower() not in decisions]
+    if missing_nodes:
+        raise ValueError(f"Missing decisions for nodes: {missing_nodes} (every supplier and roastery needs a decision)")
+    return (
+        tuple(_normalize_supplier(s, decisions[s.lower()]) for s in suppliers)
+        + tuple(_normalize_roastery(r, decisions[r.lower()]) for r in roasteries)
+    )
+
+def activations_from_key(decision_key, suppliers, roasteries):
+    """Get 0/1 activation dicts (as used for fixing the model variables) from a canonical key.
+
+    Args:
+        decision_key (tuple): canonical key (see canonical_decision_key()).
+        suppliers (iterable): supplier names in network order.
+        roasteries (iterable): roastery names in network order.
+
+    Returns:
+        tuple: fixed_s_activation ({'supplier1': 1, ...}) and fixed_r_activation ({'roastery1_low': 0, 'roastery1_high': 1, ...}).
+    """
+    suppliers, roasteries = list(suppliers), list(roasteries)
+    fixed_s_activation = dict(zip(suppliers, decision_key[:len(suppliers)]))
+    fixed_r_activation = {}
+    for r, level in zip(roasteries, decision_key[len(suppliers):]):
+        for i, lvl in enumerate(ROASTERY_LEVELS, start=1):
+            fixed_r_activation[f"{r}_{lvl}"] = int(level == i)
+    return fixed_s_activation, fixed_r_activation
+
+def decisions_from_key(decision_key, suppliers, roasteries):
+    """Get decisions in the wording used towards the LLM and participants.
+
+    Returns:
+        dict: e.g. {"supplier1": "activate", ..., "roastery2": "activate (low)"}.
+    """
+    suppliers, roasteries = list(suppliers), list(roasteries)
+    result = {s: "activate" if act else "do not activate" for s, act in zip(suppliers, decision_key[:len(suppliers)])}
+    for r, level in zip(roasteries, decision_key[len(suppliers):]):
+        result[r] = f"activate ({ROASTERY_LEVELS[level - 1]})" if level else "do not activate"
+    return result
+
+def decisions_str_from_key(decision_key, num_suppliers):
+    """Get the standardized decisions string (as in the data files), e.g. 'S1____S3___R1-h_____'.
+    """
+    supplier_parts = [f"S{i}" if act else "__" for i, act in enumerate(decision_key[:num_suppliers], start=1)]
+    roastery_parts = [f"R{i}-{ROASTERY_LEVELS[level - 1][0]}" if level else "____"
+                      for i, level in enumerate(decision_key[num_suppliers:], start=1)]
+    return "_".join(supplier_parts) + "___" + "_".join(roastery_parts)
+
+def key_from_decisions_str(decisions_str, num_suppliers):
+    """Inverse of decisions_str_from_key().
+    """
+    supplier_str, roastery_str = decisions_str[:3 * num_suppliers - 1], decisions_str[3 * num_suppliers + 2:]
+    supplier_parts = [supplier_str[3 * i:3 * i + 2] for i in range(num_suppliers)]
+    roastery_parts = [roastery_str[5 * i:5 * i + 4] for i in range((len(roastery_str) + 1) // 5)]
+    return (
+        tuple(int(part != "__") for part in supplier_parts)
+        + tuple(0 if part == "____" else 1 + [lvl[0] for lvl in ROASTERY_LEVELS].index(part[-1]) for part in roastery_parts)
+    )
+
+def all_decision_keys(num_suppliers, num_roasteries):
+    """Enumerate all activation combinations as canonical keys (in the order of the data files).
+    """
+    return [
+        s_comb + r_comb
+        for s_comb in itertools.product([0, 1], repeat=num_suppliers)
+        for r_comb in itertools.product(range(len(ROASTERY_LEVELS) + 1), repeat=num_roasteries)
+    ]
@@ -0,0 +1,111 @@
+"""Efficient frontier of the activation decisions (choices of the Part 2 risk test).
+
+A decision is on the frontier if no other decision has a higher (or equal) expected profit at a
+lower (or equal) risk. All activation combinations are evaluated in one batched pass on one model
+instance, so re-parameterizing the experiment takes seconds instead of an export run.
+
+Usage (prints C.CUSTOM_TEST_CHOICES for constants.py):
+    python -m llms_decision_support.python_files.efficient_frontier [--scenario-mode exact]
+"""
+import argparse
+import numpy as np
+from llms_decision_support.python_files.coffee_data import get_coffee_network_data, network_data_hash
+from llms_decision_support.python_files.coffee_stochastic_evaluation import StochasticModel
+from llms_decision_support.python_files.decisions import all_decision_keys, canonical_decision_key, decisions_str_from_key
+
+RISK_MEASURES = ["sd", "cv"]
+# Probability offset that makes np.round() (banker's rounding) show the largest-remainder percentages
+ROUND = 0.000000001
+
+def non_dominated(results, risk_measure="sd"):
+    """Filter evaluation results to the non-dominated (EV, risk) ones.
+
+    Args:
+        results (list): dicts with at least "ev" and the risk measure (e.g. of evaluate_stochastic_many()).
+        risk_measure (str): "sd" (standard deviation) or "cv" (coefficient of variation).
+
+    Returns:
+        list: non-dominated results, sorted by EV (descending); of equal (EV, risk) pairs only the first is kept.
+    """
+    if risk_measure not in RISK_MEASURES:
+        raise ValueError(f"Unknown risk measure '{risk_measure}' (use one of {RISK_MEASURES})")
+    ev = np.array([result["ev"] for result in results], dtype=float)
+    risk = np.array([result[risk_measure] for result in results], dtype=float)
+    # Sorted by EV (desc.) and risk (asc.), a result is non-dominated if its risk is below all previous ones
+    order = np.lexsort((risk, -ev))
+    lowest_previous_risk = np.concatenate([[np.inf], np.minimum.accumulate(risk[order])[:-1]])
+    return [results[i] for i in order[risk[order] < lowest_previous_risk]]
+
+def display_probabilities(profit_probs):
+    """Get probabilities that are displayed as whole percentages summing up to 100%.
+
+    Percentages are assigned by largest remainder; probabilities whose np.round(100 * p) would differ
+    are shifted by ROUND (the net shift is taken from the most likely profit, so they still sum up to 1).
+
+    Args:
+        profit_probs (dict): profit values and their probabilities.
+
+    Returns:
+        dict: integer profit values and (slightly shifted) probabilities.
+    """
+    profits = [int(np.round(profit)) for profit in profit_probs]
+    probs = np.array(list(profit_probs.values()), dtype=float)
+    percents = np.floor(100 * probs + 1e-9)
+    remainders = 100 * probs - percents
+    percents[np.argsort(-remainders, kind='stable')[:int(np.round(100 - percents.sum()))]] += 1
+
+    shifts = np.sign(percents - np.round(100 * probs)) * ROUND
+    shifts[np.argmax(probs)] -= shifts.sum()
+    return {profit: float(prob) for profit, prob in zip(profits, np.round(probs, 12) + shifts)}
+
+def frontier_choices(data=None, scenario_mode="sampled", risk_measure="sd"):
+    """Compute the Part 2 choices (structure of C.CUSTOM_TEST_CHOICES) from the stochastic model.
+
+    Args:
+        data (dict): coffee network data (see coffee_data.py); defaults to the experiment setting.
+        scenario_mode (str): "sampled" or "exact".
+        risk_measure (str): "sd" or "cv" (see non_dominated()).
+
+    Returns:
+        list: dicts with 'id' (1 = highest EV), formatted 'ev', 'cv' and 'sd', 'scenarios'
+        (profit: probability) and 'decisions' (standardized decisions string, e.g. 'S1____S3___R1-h_____').
+    """
+    data = data if data is not None else get_coffee_network_data()
+    stoch_model = StochasticModel.get_reference_model()
+    if stoch_model.model_hash != network_data_hash(data, scenario_mode=scenario_mode, seed=42):
+        # Private instance for other data (not shared with other threads)
+        with StochasticModel(scenario_mode=scenario_mode, data=data) as stoch_model:
+            results = stoch_model.evaluate_decision_keys(all_decision_keys(len(stoch_model.suppliers), len(stoch_model.roasteries)))
+    else:
+        results = StochasticModel.evaluate_stochastic_many("all")
+
+    choices = []
+    for choice_id, result in enumerate(non_dominated(results, risk_measure), start=1):
+        decision_key = canonical_decision_key(result["decisions"], stoch_model.suppliers, stoch_model.roasteries)
+        choices.append({
+            'id': choice_id,
+            'ev': f"${result['ev']:,.0f}",
+            'cv': f"{result['cv']:.0%}",
+            'sd': f"${result['sd']:,.0f}",
+            'scenarios': display_probabilities(result["scenarios"]),
+            'decisions': decisions_str_from_key(decision_key, len(stoch_model.suppliers)),
+        })
+    return choices
+
+def choices_source(choices):
+    """Get the Python source of the choices (to paste as CUSTOM_TEST_CHOICES into constants.py).
+    """
+    lines = ["CUSTOM_TEST_CHOICES = ["]
+    for choice in choices:
+        scenarios = ", ".join(f"{profit}: {prob!r}" for profit, prob in choice['scenarios'].items())
+        lines.append(f"    {{'id': {choice['id']}, 'ev': \"{choice['ev']}\", \"cv\": \"{choice['cv']}\", \"sd\": \"{choice['sd']}\", "
+                     f"\"scenarios\": {{{scenarios}}}, 'decisions': \"{choice['decisions']}\"}},")
+    lines.append("]")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print the Part 2 choices (efficient frontier) for constants.py.")
+    parser.add_argument("--scenario-mode", choices=["sampled", "exact"], default="sampled")
+    parser.add_argument("--risk-measure", choices=RISK_MEASURES, default="sd")
+    args = parser.parse_args()
+    print(choices_source(frontier_choices(scenario_mode=args.scenario_mode, risk_measure=args.risk_measure)))
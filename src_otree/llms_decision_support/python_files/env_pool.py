@@ -0,0 +1,149 @@
+"""Process-wide pool of Gurobi environments.
+
+Creating a grb.Env is slow (license check) and, under a WLS license, every env counts towards the
+session limit. All evaluators therefore take their envs from this pool:
+- short use (one solve): `with env_pool.model() as model:` or `with env_pool.checkout() as env:` (env returned on exit)
+- exec'd code (coffee_stochastic.py): the code runner checks out an env around exec (see
+  optiguide_extended._hold_gurobi_env()); the code takes it with held_env() (None without a runner,
+  e.g. when run as a script, i.e. the model uses the Gurobi default env)
+- long-lived models (pooled StochasticModel and DeterministicEvaluator instances): reserve() one env per instance
+Short uses in a thread that already holds an env (e.g. evaluation functions called from exec'd code) reuse that
+env instead of waiting for a second one, and reserved envs are not shared with other users, so no holder of an
+env ever waits for another env (no hold-and-wait). At most MAX_GUROBI_ENVS envs exist at a time:
+MAX_SHARED_ENVS shared envs (further requests wait up to `timeout` seconds for a returned env) plus the
+reservations (which fail beyond the cap).
+"""
+import atexit
+import contextlib
+import threading
+import gurobipy as grb
+from llms_decision_support.python_files.model_pool import ModelPool
+
+# Max. number of Gurobi envs of the process (i.e. license sessions): shared envs plus all reservations
+MAX_GUROBI_ENVS = 10
+# Shared envs (exec'd code, short solves); the remaining envs can be reserved by model pools
+MAX_SHARED_ENVS = 4
+# Seconds to wait for a shared env before giving up
+ENV_WAIT_TIMEOUT = 60
+# Default of the timeout arguments (the pool setting; None waits without a time limit)
+DEFAULT_TIMEOUT = object()
+
+class EnvPool(ModelPool):
+    def __init__(self, size=MAX_SHARED_ENVS, max_envs=MAX_GUROBI_ENVS, params=None, timeout=ENV_WAIT_TIMEOUT):
+        """
+        Args:
+            size (int): number of shared envs.
+            max_envs (int): max. number of envs (shared and reserved).
+            params (dict): parameters of new envs (default: no solver output).
+            timeout (float): default seconds to wait for a shared env (None: wait indefinitely).
+        """
+        if size > max_envs:
+            raise ValueError(f"{size} shared Gurobi envs exceed the max. of {max_envs} envs")
+        self.max_envs = max_envs
+        self.params = dict(params) if params is not None else {"OutputFlag": 0}
+        self.timeout = timeout
+        self.reserved = 0
+        self._envs = []
+        # Checked-out shared envs: id(env) -> (env, thread ident)
+        self._holders = {}
+        self._envs_lock = threading.Lock()
+        super().__init__(self._create_env, size)
+
+    def _create_env(self):
+        env = grb.Env(params=self.params)
+        with self._envs_lock:
+            self._envs.append(env)
+        return env
+
+    def acquire(self, timeout=DEFAULT_TIMEOUT):
+        """Check out a shared env (return it with release()).
+
+        Args:
+            timeout (float): seconds to wait for an env (None: wait indefinitely); defaults to the pool setting.
+
+        Returns:
+            grb.Env: env for exclusive use (models of one env must not be solved concurrently).
+        """
+        timeout = self.timeout if timeout is DEFAULT_TIMEOUT else timeout
+        try:
+            env = super().acquire(timeout)
+        except TimeoutError:
+            raise TimeoutError(f"No Gurobi environment available within {timeout}s "
+                               f"(max. {self.size} shared envs; see env_pool.MAX_SHARED_ENVS)") from None
+        with self._envs_lock:
+            self._holders[id(env)] = (env, threading.get_ident())
+        return env
+
+    def release(self, env):
+        with self._envs_lock:
+            self._holders.pop(id(env), None)
+        super().release(env)
+
+    def held_env(self):
+        """Get the shared env checked out by the current thread (None if there is none).
+        """
+        thread_id = threading.get_ident()
+        with self._envs_lock:
+            return next((env for env, holder in self._holders.values() if holder == thread_id), None)
+
+    @contextlib.contextmanager
+    def checkout(self, timeout=DEFAULT_TIMEOUT):
+        """Context manager: shared env for short use, returned on exit.
+
+        A thread that already holds an env (e.g. exec'd code calling evaluation functions) gets that env
+        (which stays checked out on exit), so nested use never waits for a second env.
+        """
+        env = self.held_env()
+        if env is not None:
+            yield env
+            return
+        env = self.acquire(timeout)
+        try:
+            yield env
+        finally:
+            self.release(env)
+
+    def reserve(self, count):
+        """Reserve envs for long-lived models (e.g. one per instance of a model pool).
+
+        Reserved envs are created on first use and are not shared with other users, i.e. a pool of at most
+        `count` instances gets its envs without waiting.
+
+        Args:
+            count (int): number of reserved envs.
+
+        Returns:
+            ModelPool: pool of the reserved envs (acquire() one env per long-lived model, release() it on close).
+
+        Raises:
+            RuntimeError: if the reservation exceeds max_envs.
+        """
+        with self._envs_lock:
+            if self.size + self.reserved + count > self.max_envs:
+                raise RuntimeError(f"Cannot reserve {count} Gurobi envs: {self.size} shared and {self.reserved} reserved "
+                                   f"envs of max. {self.max_envs} (see env_pool.MAX_GUROBI_ENVS)")
+            self.reserved += count
+        return ModelPool(self._create_env, size=count)
+
+    @contextlib.contextmanager
+    def model(self, timeout=DEFAULT_TIMEOUT):
+        """Context manager: new model in a shared env (see checkout()); the model is disposed and the env returned on exit.
+        """
+        with self.checkout(timeout) as env:
+            model = grb.Model(env=env)
+            try:
+                yield model
+            finally:
+                model.dispose()
+
+    def dispose(self):
+        """Dispose all envs created by the pool, incl. reserved ones (at interpreter exit; envs must not be used afterwards).
+        """
+        with self._envs_lock:
+            envs, self._envs = self._envs, []
+        for env in envs:
+            env.dispose()
+
+# Shared instance
+env_pool = EnvPool()
+atexit.register(env_pool.dispose)
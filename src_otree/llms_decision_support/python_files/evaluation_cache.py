@@ -0,0 +1,69 @@
+"""Bounded results cache for stochastic evaluations.
+
+Entries are keyed by (model hash, canonical decision key). The model hash covers the network data
+and scenario settings, so results of a changed model are never returned (old entries age out).
+"""
+from collections import OrderedDict
+import json
+import threading
+from llms_decision_support.python_files.decisions import key_from_decisions_str
+
+class EvaluationCache():
+    def __init__(self, maxsize=512):
+        """
+        Args:
+            maxsize (int): maximum number of cached results (least recently used entries are dropped).
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model_hash, decision_key):
+        """Get a cached result (or None).
+        """
+        with self._lock:
+            result = self._entries.get((model_hash, decision_key))
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((model_hash, decision_key))
+            self.hits += 1
+            return result
+
+    def put(self, model_hash, decision_key, result):
+        """Store a result (callers should not mutate it afterwards).
+        """
+        with self._lock:
+            self._entries[(model_hash, decision_key)] = result
+            self._entries.move_to_end((model_hash, decision_key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def prewarm_from_json(self, model_hash, path, num_suppliers):
+        """Fill the cache from the exported scenarios and probabilities file.
+
+        Args:
+            model_hash (str): hash of the model the file was exported from.
+            path (str): path to scenarios_and_probabilities.json ({decisions_str: "profit: prob; ..."}).
+            num_suppliers (int): number of suppliers (to parse the decisions strings).
+
+        Returns:
+            int: number of entries added.
+        """
+        with open(path, 'r') as f:
+            s_and_ps_dict = json.load(f)
+        for decisions_str, value in s_and_ps_dict.items():
+            result = {float(k): float(v) for k, v in (item.split(": ") for item in value.split("; "))}
+            result = dict(sorted(result.items(), key=lambda item: item[0], reverse=True))
+            self.put(model_hash, key_from_decisions_str(decisions_str, num_suppliers), result)
+        return len(s_and_ps_dict)
@@ -0,0 +1,56 @@
+"""Row evaluation of the all-combinations export and its worker processes (see coffee_stochastic_csv_and_json_export.py).
+
+Spawned worker processes import the llms_decision_support package again. With SOLVER_PROCESS_ENV_VAR set
+(see solver_process_pool()), its __init__.py skips the oTree app (otree/autogen imports, pages and the warm-up),
+so the workers only import the solver modules below and create only the Gurobi envs of their own model.
+"""
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+from llms_decision_support.python_files.coffee_stochastic_evaluation import StochasticModel
+from llms_decision_support.python_files.decisions import decisions_str_from_key
+
+# Set in worker processes (checked in llms_decision_support/__init__.py)
+SOLVER_PROCESS_ENV_VAR = "LLMS_DECISION_SUPPORT_SOLVER_PROCESS"
+
+def _format_number(value):
+    """Format EV/CV as in the data files (9 decimals at most, no trailing zeros).
+    """
+    return f"{round(value, 9):.9f}".rstrip("0").rstrip(".")
+
+def _format_scenarios(profit_probs):
+    """Format a profit distribution as in the data files, e.g. '5125: 0.613; 1060: 0.309' (most likely first).
+    """
+    return "; ".join(f"{profit:.0f}: {round(prob, 3)}" for profit, prob in sorted(profit_probs.items(), key=lambda item: -item[1]))
+
+def evaluate_rows(data, scenario_mode, decision_keys):
+    """Evaluate decision keys (in this or a worker process) and get their rows (see CSV_COLUMNS of the export).
+    """
+    with StochasticModel(scenario_mode=scenario_mode, data=data) as stoch_model:
+        results = stoch_model.evaluate_decision_keys(decision_keys)
+    return [[decisions_str_from_key(decision_key, len(data['s_capacity'])), _format_number(result["ev"]),
+             _format_number(result["cv"]), _format_scenarios(result["scenarios"])]
+            for decision_key, result in zip(decision_keys, results)]
+
+@contextlib.contextmanager
+def solver_process_pool(workers):
+    """Context manager: pool of spawned (not forked, so no Gurobi env of this process is shared) solver processes.
+
+    Args:
+        workers (int): number of processes.
+
+    Returns:
+        ProcessPoolExecutor: executor whose processes skip the oTree app on import.
+    """
+    previous_value = os.environ.get(SOLVER_PROCESS_ENV_VAR)
+    # Inherited by the processes, which are started on demand within the block
+    os.environ[SOLVER_PROCESS_ENV_VAR] = "1"
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            yield executor
+    finally:
+        if previous_value is None:
+            os.environ.pop(SOLVER_PROCESS_ENV_VAR, None)
+        else:
+            os.environ[SOLVER_PROCESS_ENV_VAR] = previous_value
@@ -0,0 +1,236 @@
+"""Vectorized construction of the two-stage stochastic program (extensive form).
+
+The formulation is the one of coffee_stochastic.py: binary 1st-stage activations and integer
+2nd-stage flows per scenario. Instead of one addConstr call per constraint, all constraints are
+assembled as one sparse matrix (per-scenario blocks via Kronecker products) and added with a single
+addMConstr call; the objective is set with setMObjective. Used by the evaluation engine only: the
+LLM-facing coffee_stochastic.py keeps the readable addVars/addConstr code, so the LLM can see and
+modify the constraints.
+
+Variable order: s_activation (suppliers), r_activation (roasteries x levels), then per scenario
+coffee_flow_raw (suppliers x roasteries), coffee_flow_light and coffee_flow_dark (roasteries x customers).
+"""
+import gurobipy as grb
+import numpy as np
+import scipy.sparse as sp
+from llms_decision_support.python_files.decisions import ROASTERY_LEVELS
+
+def _incidence(num_rows, num_cols, rows, cols):
+    return sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(num_rows, num_cols))
+
+def _layout(data):
+    """Get node names and the column layout of the 1st stage and of one scenario block.
+    """
+    suppliers = list(data['s_capacity'].keys())
+    roasteries = list(data['r_capacity'].keys())
+    customers = list(data['coffee_demand']['light'].keys())
+    num_first = len(suppliers) + len(roasteries) * len(ROASTERY_LEVELS)
+    num_raw, num_roasted = len(suppliers) * len(roasteries), len(roasteries) * len(customers)
+    raw_sr = np.arange(num_raw).reshape(len(suppliers), len(roasteries))
+    light_rc = num_raw + np.arange(num_roasted).reshape(len(roasteries), len(customers))
+    dark_rc = light_rc + num_roasted
+    return suppliers, roasteries, customers, num_first, num_raw + 2 * num_roasted, raw_sr, light_rc, dark_rc
+
+def build_extensive_form(model, data, scenarios, scenario_probs):
+    """Add variables, constraints and objective of the extensive form to a (new) Gurobi model.
+
+    Args:
+        model (grb.Model): empty model.
+        data (dict): coffee network data (see coffee_data.py).
+        scenarios (list): (supplier defaults, roastery defaults) tuples of dicts.
+        scenario_probs (list): probability per scenario.
+
+    Returns:
+        dict: s_activation, r_activation, coffee_flow_raw, coffee_flow_light and coffee_flow_dark
+        (tupledicts with the same keys as model.addVars), x (MVar of all variables), profit_matrix
+        (sparse, scenarios x variables) and profit_constant (see scenario_profits()).
+    """
+    suppliers, roasteries, customers, num_first, num_flows, raw_sr, light_rc, dark_rc = _layout(data)
+    num_s, num_r, num_c, num_l, num_n = len(suppliers), len(roasteries), len(customers), len(ROASTERY_LEVELS), len(scenarios)
+    num_raw, num_roasted = num_s * num_r, num_r * num_c
+
+    # Variables (names as with model.addVars)
+    first_names = [f"s_activation[{s}]" for s in suppliers] + [f"r_activation[{r},{lvl}]" for r in roasteries for lvl in ROASTERY_LEVELS]
+    flow_names = [f"coffee_flow_raw[{{n}},{s},{r}]" for s in suppliers for r in roasteries] \
+        + [f"coffee_flow_{kind}[{{n}},{r},{c}]" for kind in ['light', 'dark'] for r in roasteries for c in customers]
+    names = first_names + [name.format(n=n) for n in range(num_n) for name in flow_names]
+    vtypes = [grb.GRB.BINARY] * num_first + [grb.GRB.INTEGER] * (num_n * num_flows)
+    x = model.addMVar(len(names), vtype=np.array(vtypes), name=np.array(names))
+
+    # Node-arc incidence within one scenario block
+    rows_s, cols_r = np.divmod(np.arange(num_raw), num_r)
+    rows_r, cols_c = np.divmod(np.arange(num_roasted), num_c)
+    raw_out = _incidence(num_s, num_flows, rows_s, raw_sr[rows_s, cols_r])
+    raw_in = _incidence(num_r, num_flows, cols_r, raw_sr[rows_s, cols_r])
+    roasted_out = _incidence(num_r, num_flows, np.tile(rows_r, 2), np.concatenate([light_rc[rows_r, cols_c], dark_rc[rows_r, cols_c]]))
+    light_in = _incidence(num_c, num_flows, cols_c, light_rc[rows_r, cols_c])
+    dark_in = _incidence(num_c, num_flows, cols_c, dark_rc[rows_r, cols_c])
+
+    # Activated capacity per roastery and supplier (1st-stage columns)
+    r_capacity = sp.lil_matrix((num_r, num_first))
+    for i, r in enumerate(roasteries):
+        for j, lvl in enumerate(ROASTERY_LEVELS):
+            r_capacity[i, num_s + i * num_l + j] = data['r_capacity'][r][lvl]
+    s_capacity = sp.hstack([sp.diags([float(data['s_capacity'][s]) for s in suppliers]), sp.csr_matrix((num_s, num_first - num_s))])
+
+    # Per-scenario constraints: roasting capacity, flow conservation, supplier capacity, light and dark demand
+    block_flows = sp.vstack([roasted_out, raw_in - roasted_out, raw_out, light_in, dark_in])
+    block_first = sp.vstack([-r_capacity, sp.csr_matrix((num_r, num_first)), -s_capacity, sp.csr_matrix((2 * num_c, num_first))])
+    block_sense = ['<'] * num_r + ['='] * num_r + ['<'] * num_s + ['<'] * (2 * num_c)
+    block_rhs = np.concatenate([np.zeros(2 * num_r + num_s),
+                                [data['coffee_demand']['light'][c] for c in customers],
+                                [data['coffee_demand']['dark'][c] for c in customers]])
+
+    # Disrupted roasteries roast nothing, disrupted suppliers ship nothing
+    disrupted = np.array([[r_defs[r] for r in roasteries] + [s_defs[s] for s in suppliers] for s_defs, r_defs in scenarios], dtype=bool).reshape(-1)
+    disrupted_flows = sp.kron(sp.identity(num_n), sp.vstack([roasted_out, raw_out]), format='csr')[disrupted]
+
+    # Roastery activated in at most one level
+    level_choice = sp.hstack([sp.csr_matrix((num_r, num_s)), sp.kron(sp.identity(num_r), np.ones((1, num_l)))])
+
+    a_matrix = sp.vstack([
+        sp.hstack([level_choice, sp.csr_matrix((num_r, num_n * num_flows))]),
+        sp.hstack([sp.vstack([block_first] * num_n), sp.kron(sp.identity(num_n), block_flows)]),
+        sp.hstack([sp.csr_matrix((disrupted_flows.shape[0], num_first)), disrupted_flows]),
+    ], format='csr')
+    sense = np.array(['<'] * num_r + block_sense * num_n + ['='] * disrupted_flows.shape[0])
+    rhs = np.concatenate([np.ones(num_r), np.tile(block_rhs, num_n), np.zeros(disrupted_flows.shape[0])])
+    model.addMConstr(a_matrix, x, sense, rhs)
+
+    objective, profit_matrix = objective_coefficients(data, scenario_probs)
+    model.setMObjective(None, objective, data['fixed_income_bonuspool'] * sum(float(p) for p in scenario_probs), xc=x, sense=grb.GRB.MAXIMIZE)
+
+    return _variables(x, data, num_n, profit_matrix)
+
+def _profit_matrix(data, num_scenarios):
+    """Get the profit coefficients per scenario (scenarios x variables; bonus pool excluded).
+    """
+    suppliers, roasteries, customers, num_first, num_flows, raw_sr, light_rc, dark_rc = _layout(data)
+
+    # Profit per scenario: bonus pool + margin contribution of the flows - fixed costs of the activations
+    fixed_costs = [data['fixed_supplier_cost'][s] for s in suppliers] \
+        + [data['fixed_roasting_cost'][r][lvl] for r in roasteries for lvl in ROASTERY_LEVELS]
+    contribution = np.zeros(num_flows)
+    for (s, r), cost in data['shipping_cost_s_to_r'].items():
+        contribution[raw_sr[suppliers.index(s), roasteries.index(r)]] = -cost
+    for (r, c), cost in data['shipping_cost_r_to_c'].items():
+        i, j = roasteries.index(r), customers.index(c)
+        contribution[light_rc[i, j]] = data['selling_price'] - cost - data['variable_roasting_cost_light'][r]
+        contribution[dark_rc[i, j]] = data['selling_price'] - cost - data['variable_roasting_cost_dark'][r]
+    return sp.hstack([
+        sp.csr_matrix(np.tile(-np.array(fixed_costs, dtype=float), (num_scenarios, 1))),
+        sp.kron(sp.identity(num_scenarios), contribution.reshape(1, -1)),
+    ], format='csr')
+
+def _variables(x, data, num_scenarios, profit_matrix):
+    """Get name-indexed access to the variables (e.g. s_activation['supplier1'], coffee_flow_raw[n, s, r]).
+    """
+    suppliers, roasteries, customers, num_first, num_flows, raw_sr, light_rc, dark_rc = _layout(data)
+    num_s = len(suppliers)
+    x_vars = x.tolist()
+    flow_vars = [x_vars[num_first + n * num_flows:num_first + (n + 1) * num_flows] for n in range(num_scenarios)]
+    return {
+        's_activation': grb.tupledict(zip(suppliers, x_vars[:num_s])),
+        'r_activation': grb.tupledict(zip([(r, lvl) for r in roasteries for lvl in ROASTERY_LEVELS], x_vars[num_s:num_first])),
+        'coffee_flow_raw': grb.tupledict(
+            ((n, s, r), flow_vars[n][raw_sr[i, j]]) for n in range(num_scenarios) for i, s in enumerate(suppliers) for j, r in enumerate(roasteries)),
+        'coffee_flow_light': grb.tupledict(
+            ((n, r, c), flow_vars[n][light_rc[i, j]]) for n in range(num_scenarios) for i, r in enumerate(roasteries) for j, c in enumerate(customers)),
+        'coffee_flow_dark': grb.tupledict(
+            ((n, r, c), flow_vars[n][dark_rc[i, j]]) for n in range(num_scenarios) for i, r in enumerate(roasteries) for j, c in enumerate(customers)),
+        'x': x,
+        'profit_matrix': profit_matrix,
+        'profit_constant': float(data['fixed_income_bonuspool']),
+    }
+
+def constraint_rows(data, num_scenarios):
+    """Get the positions (in model.getConstrs() order) of the per-scenario constraints.
+
+    Args:
+        data (dict): coffee network data the model was built with.
+        num_scenarios (int): number of scenarios the model was built with.
+
+    Returns:
+        dict: row indices per scenario and node ((num_scenarios, nodes) arrays) for
+        'r_capacity', 'flow_conservation', 's_capacity', 'demand_light' and 'demand_dark'.
+    """
+    suppliers, roasteries, customers = _layout(data)[:3]
+    num_s, num_r, num_c = len(suppliers), len(roasteries), len(customers)
+    # Level choice rows first, then one block per scenario (order as in build_extensive_form())
+    block_starts = num_r + (2 * num_r + num_s + 2 * num_c) * np.arange(num_scenarios).reshape(-1, 1)
+    return {
+        'r_capacity': block_starts + np.arange(num_r),
+        'flow_conservation': block_starts + num_r + np.arange(num_r),
+        's_capacity': block_starts + 2 * num_r + np.arange(num_s),
+        'demand_light': block_starts + 2 * num_r + num_s + np.arange(num_c),
+        'demand_dark': block_starts + 2 * num_r + num_s + num_c + np.arange(num_c),
+    }
+
+def objective_coefficients(data, scenario_probs):
+    """Get the objective coefficients (expected profit per unit of each variable) and the profit matrix.
+
+    Returns:
+        tuple: coefficient vector (one per variable) and profit matrix (see build_extensive_form()).
+    """
+    profit_matrix = _profit_matrix(data, len(scenario_probs))
+    probs = np.array([float(p) for p in scenario_probs])
+    return profit_matrix.T @ probs, profit_matrix
+
+def extensive_form_variables(model, data, num_scenarios):
+    """Get the variables dict (as returned by build_extensive_form()) of a model read from file.
+
+    Args:
+        model (grb.Model): model written after build_extensive_form() and read with grb.read().
+        data (dict): coffee network data the model was built with.
+        num_scenarios (int): number of scenarios the model was built with.
+
+    Returns:
+        dict: see build_extensive_form().
+    """
+    x = grb.MVar.fromlist(model.getVars())
+    return _variables(x, data, num_scenarios, _profit_matrix(data, num_scenarios))
+
+def scenario_profits(variables):
+    """Get the profit per scenario of the current solution (one getAttr call and one sparse mat-vec product).
+
+    Args:
+        variables (dict): result of build_extensive_form() (after model.optimize()).
+
+    Returns:
+        np.ndarray: profit per scenario index.
+    """
+    # All variables are binary or integer; rounding removes solver tolerances from the profit values
+    x_values = np.round(variables['x'].getAttr(grb.GRB.Attr.X))
+    return variables['profit_matrix'] @ x_values + variables['profit_constant']
+
+def solution_arrays(variables, data, x_values=None):
+    """Get the current solution as NumPy arrays (one getAttr call instead of one .X access per variable).
+
+    Args:
+        variables (dict): result of build_extensive_form() (after model.optimize()).
+        data (dict): coffee network data the model was built with.
+        x_values (np.ndarray): rounded values of all variables if already read (e.g. for the scenario profits).
+
+    Returns:
+        dict: 's_activation' (suppliers), 'r_activation' (roasteries x levels), 'coffee_flow_raw'
+        (scenarios x suppliers x roasteries), 'coffee_flow_light' and 'coffee_flow_dark' (scenarios x roasteries x customers),
+        nodes in data order.
+    """
+    suppliers, roasteries, customers, num_first, num_flows, raw_sr, light_rc, dark_rc = _layout(data)
+    if x_values is None:
+        # All variables are binary or integer; rounding removes solver tolerances
+        x_values = np.round(variables['x'].getAttr(grb.GRB.Attr.X))
+    flows = x_values[num_first:].reshape(-1, num_flows)
+    return {
+        's_activation': x_values[:len(suppliers)],
+        'r_activation': x_values[len(suppliers):num_first].reshape(len(roasteries), len(ROASTERY_LEVELS)),
+        'coffee_flow_raw': flows[:, raw_sr],
+        'coffee_flow_light': flows[:, light_rc],
+        'coffee_flow_dark': flows[:, dark_rc],
+    }
+
+def solution_decision_key(solution):
+    """Get the canonical decision key (see decisions.py) of a solution (see solution_arrays()).
+    """
+    levels = solution['r_activation'] @ np.arange(1, len(ROASTERY_LEVELS) + 1)
+    return tuple(int(act) for act in solution['s_activation']) + tuple(int(level) for level in levels)
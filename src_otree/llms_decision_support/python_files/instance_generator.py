@@ -0,0 +1,66 @@
+"""Synthetic coffee-network instances of configurable size (for scaling benchmarks, see benchmarks.py).
+
+Instances have the dict format of coffee_data.py (node names supplier1.., roastery1.., customer1..),
+with cost, price and demand ranges around the experiment setting. Roasteries keep the levels of
+decisions.ROASTERY_LEVELS (used by the decision keys and models); their capacities per level are
+configurable multiples of the lowest level.
+"""
+import numpy as np
+from llms_decision_support.python_files.decisions import ROASTERY_LEVELS
+
+def generate_network_data(num_suppliers=3, num_roasteries=2, num_customers=3, num_risky_nodes=2, num_scenarios=1000,
+                          level_factors=(1, 2), capacity_slack=1.2, seed=0):
+    """Generate a random coffee network.
+
+    Args:
+        num_suppliers (int): number of suppliers.
+        num_roasteries (int): number of roasteries.
+        num_customers (int): number of customers.
+        num_risky_nodes (int): number of suppliers/roasteries with a nonzero default probability (drawn at random).
+        num_scenarios (int): number of sampled scenarios.
+        level_factors (tuple): roasting capacity per level (as in ROASTERY_LEVELS) relative to the lowest level.
+        capacity_slack (float): total supplier capacity (and total roasting capacity at the highest level)
+            relative to the total demand.
+        seed (int): seed of the random instance.
+
+    Returns:
+        dict: network data (see coffee_data.py).
+    """
+    if len(level_factors) != len(ROASTERY_LEVELS):
+        raise ValueError(f"Need one capacity factor per roastery level {ROASTERY_LEVELS}")
+    if num_risky_nodes > num_suppliers + num_roasteries:
+        raise ValueError("More risky nodes than suppliers and roasteries")
+    rng = np.random.default_rng(seed)
+    suppliers = [f"supplier{i}" for i in range(1, num_suppliers + 1)]
+    roasteries = [f"roastery{i}" for i in range(1, num_roasteries + 1)]
+    customers = [f"customer{i}" for i in range(1, num_customers + 1)]
+
+    demand_light = rng.integers(20, 41, num_customers)
+    demand_dark = rng.integers(20, 101, num_customers)
+    total_demand = int(demand_light.sum() + demand_dark.sum())
+
+    # Capacities: random shares of the (slackened) total demand
+    s_capacity = np.maximum(1, np.round(rng.dirichlet(np.full(num_suppliers, 4.0)) * capacity_slack * total_demand)).astype(int)
+    r_capacity_low = np.maximum(1, np.round(rng.dirichlet(np.full(num_roasteries, 4.0)) * capacity_slack * total_demand / max(level_factors)))
+    fixed_roasting_low = rng.integers(400, 501, num_roasteries)
+
+    risky_nodes = set(rng.choice(suppliers + roasteries, size=num_risky_nodes, replace=False).tolist())
+    default_prob = {node: float(rng.choice([0.05, 0.1, 0.2, 0.3])) if node in risky_nodes else 0.0 for node in suppliers + roasteries}
+
+    return {
+        's_capacity': {s: int(cap) for s, cap in zip(suppliers, s_capacity)},
+        'r_capacity': {r: {lvl: int(cap * factor) for lvl, factor in zip(ROASTERY_LEVELS, level_factors)} for r, cap in zip(roasteries, r_capacity_low)},
+        'fixed_supplier_cost': {s: int(cost) for s, cost in zip(suppliers, rng.integers(250, 751, num_suppliers))},
+        'fixed_roasting_cost': {r: {lvl: int(cost + 200 * i) for i, lvl in enumerate(ROASTERY_LEVELS)} for r, cost in zip(roasteries, fixed_roasting_low)},
+        'variable_roasting_cost_light': {r: int(cost) for r, cost in zip(roasteries, rng.integers(3, 6, num_roasteries))},
+        'variable_roasting_cost_dark': {r: int(cost) for r, cost in zip(roasteries, rng.integers(5, 7, num_roasteries))},
+        'shipping_cost_s_to_r': {(s, r): int(rng.integers(2, 8)) for s in suppliers for r in roasteries},
+        'shipping_cost_r_to_c': {(r, c): int(rng.integers(2, 7)) for r in roasteries for c in customers},
+        'coffee_demand': {'light': {c: int(d) for c, d in zip(customers, demand_light)},
+                          'dark': {c: int(d) for c, d in zip(customers, demand_dark)}},
+        'selling_price': 30,
+        'fixed_income_bonuspool': 2210,
+        'num_scenarios': num_scenarios,
+        's_default_prob': {s: default_prob[s] for s in suppliers},
+        'r_default_prob': {r: default_prob[r] for r in roasteries},
+    }
@@ -0,0 +1,54 @@
+"""Lazily loaded constants (file contents, API keys, modules) of the constants class.
+
+Loading these at class-definition time costs every oTree worker and CLI command the file I/O and
+imports (and fails without an API key file). Instead, a LazyConstant loads its value on first access
+and caches it; preload_constants() loads all of them up front (e.g. during the server warm-up).
+"""
+import threading
+
+class LazyConstant():
+    def __init__(self, loader):
+        """
+        Args:
+            loader (callable): returns the value (called once, on first access).
+        """
+        self.loader = loader
+        self.name = loader.__name__
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._value = self.loader()
+                    self._loaded = True
+        return self._value
+
+def lazy_constants(constants_class):
+    """Get the lazy constants of a class by name.
+    """
+    return {name: value for cls in reversed(constants_class.__mro__) for name, value in vars(cls).items() if isinstance(value, LazyConstant)}
+
+def preload_constants(constants_class, names=None):
+    """Load lazy constants now (errors are collected, the constants stay unloaded and retry on access).
+
+    Args:
+        constants_class (type): class with LazyConstant attributes (e.g. C).
+        names (list): names of the constants to load (default: all).
+
+    Returns:
+        dict: error message per constant that could not be loaded.
+    """
+    errors = {}
+    for name, constant in lazy_constants(constants_class).items():
+        if names is None or name in names:
+            try:
+                constant.__get__(None, constants_class)
+            except Exception as e:
+                errors[name] = repr(e)
+    return errors
@@ -0,0 +1,116 @@
+"""Pool of model instances for concurrent evaluations.
+
+Evaluations mutate model state (fixed bounds, solver caches, Gurobi envs), so every thread checks out
+its own instance. Instances are created lazily up to the pool size; further requests wait for a
+returned instance.
+"""
+import contextlib
+import queue
+import threading
+import time
+
+class ModelPool():
+    def __init__(self, factory, size=4, instances=None):
+        """
+        Args:
+            factory (callable): creates a new (equivalent) model instance.
+            size (int): maximum number of instances.
+            instances (list): already created instances to start with.
+        """
+        self.factory = factory
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.created = 0
+        for instance in instances or []:
+            self._idle.put(instance)
+            self.created += 1
+        # Wait-time metrics (time until an instance was available, incl. lazy creation)
+        self.checkouts = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def acquire(self, timeout=None):
+        """Check out an instance (return it with release()).
+
+        Args:
+            timeout (float): maximum seconds to wait for an instance (None: wait indefinitely).
+
+        Returns:
+            object: model instance for exclusive use.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            create = self._idle.empty() and self.created < self.size
+            if create:
+                self.created += 1
+        if create:
+            try:
+                instance = self.factory()
+            except Exception:
+                with self._lock:
+                    self.created -= 1
+                raise
+        else:
+            try:
+                instance = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError(f"No model instance available within {timeout}s (pool size {self.size})")
+
+        wait_time = time.perf_counter() - start
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+        return instance
+
+    def release(self, instance):
+        self._idle.put(instance)
+
+    def prefill(self, setup=None):
+        """Create all instances up to the pool size (e.g. during server warm-up).
+
+        Args:
+            setup (callable): optional preparation applied to each new instance (e.g. building its solver model).
+        """
+        while True:
+            with self._lock:
+                if self.created >= self.size:
+                    return
+                self.created += 1
+            try:
+                instance = self.factory()
+                if setup is not None:
+                    setup(instance)
+            except Exception:
+                with self._lock:
+                    self.created -= 1
+                raise
+            self._idle.put(instance)
+
+    @contextlib.contextmanager
+    def checkout(self, timeout=None):
+        """Context manager around acquire() and release().
+        """
+        instance = self.acquire(timeout)
+        try:
+            yield instance
+        finally:
+            self.release(instance)
+
+    def stats(self):
+        """Get usage and wait-time metrics.
+
+        Returns:
+            dict: size, created and idle instances, checkouts, total/mean/max wait time (seconds).
+        """
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self.created,
+                "idle": self._idle.qsize(),
+                "checkouts": self.checkouts,
+                "total_wait_time": self.total_wait_time,
+                "mean_wait_time": self.total_wait_time / self.checkouts if self.checkouts else 0.0,
+                "max_wait_time": self.max_wait_time,
+            }
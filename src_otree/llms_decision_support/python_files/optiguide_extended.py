@@ -7,6 +7,7 @@ The OptiGuide agent (=procedural python script) will interact with LLM-based age
 Notes:
 We assume there is a Gurobi model `model` in the global scope.
 """
+import contextlib
 import re
 from typing import Dict, List, Optional, Union
 
@@ -19,7 +20,9 @@ from termcolor import colored
 
 try:
     from gurobipy import GRB
+    from llms_decision_support.python_files.env_pool import env_pool
 except Exception:
+    env_pool = None
     print("Note: Gurobi not loaded")
 
 import sys
@@ -419,28 +422,52 @@ def _run_with_exec(src_code: str, participant_id: int) -> Union[str, Exception]:
 
     # Adding a timout/threading did not work with oTree; if desired: find your own workaround
     ans = ""
-    try:
-        # Use custom class DualOutput to output to console and to a string
-        dual_output = DualOutput()
-        sys.stdout = dual_output
-
-        exec(src_code, locals_dict, locals_dict)
-
-        # Reset stdout to default
-        sys.stdout = dual_output.console
-    except Exception as e:
-        return e
-
-    try:
-        # Provide console output in addition to optimal value
-        cons_output = dual_output.get_log()
-        if cons_output != "":
-            ans = cons_output + "\n"
-        ans += _get_optimization_result(locals_dict)
-    except:
-        ans += ""
+    with _hold_gurobi_env(locals_dict):
+        try:
+            # Use custom class DualOutput to output to console and to a string
+            dual_output = DualOutput()
+            sys.stdout = dual_output
 
-    return ans
+            exec(src_code, locals_dict, locals_dict)
+
+            # Reset stdout to default
+            sys.stdout = dual_output.console
+        except Exception as e:
+            return e
+
+        try:
+            # Provide console output in addition to optimal value
+            cons_output = dual_output.get_log()
+            if cons_output != "":
+                ans = cons_output + "\n"
+            ans += _get_optimization_result(locals_dict)
+        except:
+            ans += ""
+
+        return ans
+
+
+@contextlib.contextmanager
+def _hold_gurobi_env(locals_dict: dict):
+    """Context manager: hold a shared Gurobi env for code executed within (taken with env_pool.held_env());
+    the model of the executed code is disposed and the env returned to the shared env pool on exit.
+
+    Args:
+        locals_dict (dict): variables of the executed code (incl. 'model').
+    """
+    if env_pool is None:
+        yield
+        return
+    with env_pool.checkout():
+        try:
+            yield
+        finally:
+            model = locals_dict.get("model")
+            if model is not None:
+                try:
+                    model.dispose()
+                except Exception:
+                    pass
 
 
 def _replace(src_code: str, old_code: str, new_code: str) -> str:
@@ -554,7 +554,7 @@ class C_P1_Decision_making(Page):
     @staticmethod
     def vars_for_template(player: Player):       
         disruption_risks_info = create_disruption_risks_info(player)
-        p1_provided_solution = get_provided_solution(player, disruption_risks_info)
+        p1_provided_solution = get_provided_solution(player)
         disruption_risks_info = {key: int(value*100) for key, value in disruption_risks_info.items()}
         p1_provided_decisions = p1_provided_solution["decisions"]
         provided_profit = p1_provided_solution["profit"]
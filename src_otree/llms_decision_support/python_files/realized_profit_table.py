@@ -0,0 +1,142 @@
+"""Precomputed realized profits (evaluate_deterministic) for all activation combinations x disruption outcomes.
+
+The table (72 decision keys x 2^5 outcomes for the experiment network) is built offline and shipped
+as a compressed .npz array. It is loaded once (at warm-up, see warmup.py), so calculate_realized_profit()
+is a lookup; the solver is only used if the table is missing, outdated or misses the requested entry.
+
+Rows follow decisions.all_decision_keys(), columns the disruption bitmask (bit i: i-th node in network
+order, suppliers first, is disrupted). The file stores a format version and the hash of the network
+data; a table that does not match both is ignored.
+
+Rebuild after changing the network data (from src_otree):
+    python -m llms_decision_support.python_files.realized_profit_table
+"""
+import argparse
+import os
+import threading
+import numpy as np
+from llms_decision_support.python_files.coffee_data import get_coffee_network_data, network_data_hash
+from llms_decision_support.python_files.decisions import all_decision_keys, decisions_from_key
+
+PROFIT_TABLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data_files", "realized_profit_table.npz")
+# Change when the table layout changes (invalidates shipped tables)
+PROFIT_TABLE_VERSION = 1
+
+def _table_hash(data):
+    return network_data_hash(data, table="realized_profit")
+
+class RealizedProfitTable():
+    def __init__(self, profits, suppliers, roasteries):
+        """
+        Args:
+            profits (np.ndarray): profit per decision key (rows, see all_decision_keys()) and disruption bitmask (columns);
+                NaN where evaluate_deterministic() did not return a profit.
+            suppliers (list): supplier names in network order.
+            roasteries (list): roastery names in network order.
+        """
+        self.profits = profits
+        self.suppliers = list(suppliers)
+        self.roasteries = list(roasteries)
+        self.nodes = self.suppliers + self.roasteries
+        # Row per decisions in the canonical wording (other wordings are left to the solver)
+        self.rows = {tuple(decisions_from_key(key, self.suppliers, self.roasteries).values()): row
+                     for row, key in enumerate(all_decision_keys(len(self.suppliers), len(self.roasteries)))}
+
+    def lookup(self, fixed_activation_decisions, specific_disruption_outcome):
+        """Get the realized profit; arguments as for evaluate_deterministic().
+
+        Returns:
+            float: profit, or None if the table has no entry (e.g. decisions not given for all nodes).
+        """
+        if len(fixed_activation_decisions) != len(self.nodes):
+            return None
+        row = self.rows.get(tuple(fixed_activation_decisions.get(node) for node in self.nodes))
+        if row is None:
+            return None
+        column = sum(1 << i for i, node in enumerate(self.nodes) if specific_disruption_outcome.get(node, False))
+        profit = self.profits[row, column]
+        return None if np.isnan(profit) else np.float64(profit)
+
+    @classmethod
+    def build(cls, data=None):
+        """Evaluate all decision keys x disruption outcomes with evaluate_deterministic() (offline, needs Gurobi).
+
+        Args:
+            data (dict): network data (default: experiment data, which evaluate_deterministic() is built for).
+        """
+        from llms_decision_support.python_files.coffee_deterministic_evaluation import evaluate_deterministic
+        data = data if data is not None else get_coffee_network_data()
+        suppliers, roasteries = list(data['s_capacity']), list(data['r_capacity'])
+        nodes = suppliers + roasteries
+        keys = all_decision_keys(len(suppliers), len(roasteries))
+        profits = np.full((len(keys), 2 ** len(nodes)), np.nan, dtype=np.float32)
+        for row, key in enumerate(keys):
+            decisions = decisions_from_key(key, suppliers, roasteries)
+            for column in range(2 ** len(nodes)):
+                disruptions = {node: bool(column >> i & 1) for i, node in enumerate(nodes)}
+                result = evaluate_deterministic(decisions, disruptions)
+                if not isinstance(result, str):
+                    profits[row, column] = result
+        return cls(profits, suppliers, roasteries)
+
+    def save(self, path=PROFIT_TABLE_PATH, data=None):
+        """Store the table with version and data hash (written to a temporary file and moved into place).
+        """
+        data = data if data is not None else get_coffee_network_data()
+        # np.savez appends ".npz" to other file names
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp_path, profits=self.profits, suppliers=self.suppliers, roasteries=self.roasteries,
+                            version=PROFIT_TABLE_VERSION, data_hash=_table_hash(data))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=PROFIT_TABLE_PATH, data=None):
+        """Load a stored table.
+
+        Returns:
+            RealizedProfitTable: the table, or None if the file is missing or does not match version and data.
+        """
+        data = data if data is not None else get_coffee_network_data()
+        try:
+            with np.load(path) as f:
+                if int(f["version"]) != PROFIT_TABLE_VERSION or str(f["data_hash"]) != _table_hash(data):
+                    return None
+                return cls(f["profits"], f["suppliers"].tolist(), f["roasteries"].tolist())
+        except (OSError, KeyError, ValueError):
+            return None
+
+_profit_table = None
+_profit_table_loaded = False
+_profit_table_lock = threading.Lock()
+
+def get_profit_table():
+    """Get the shipped table (loaded on first call; None if not usable).
+    """
+    global _profit_table, _profit_table_loaded
+    if not _profit_table_loaded:
+        with _profit_table_lock:
+            if not _profit_table_loaded:
+                _profit_table = RealizedProfitTable.load()
+                _profit_table_loaded = True
+    return _profit_table
+
+def realized_profit(fixed_activation_decisions, specific_disruption_outcome):
+    """Get the realized profit from the table, with evaluate_deterministic() as fallback; arguments and result as there.
+    """
+    table = get_profit_table()
+    profit = table.lookup(fixed_activation_decisions, specific_disruption_outcome) if table is not None else None
+    if profit is not None:
+        return profit
+    # Solver only needed for misses
+    from llms_decision_support.python_files.coffee_deterministic_evaluation import evaluate_deterministic
+    return evaluate_deterministic(fixed_activation_decisions, specific_disruption_outcome)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the realized-profit table of all activation combinations x disruption outcomes.")
+    parser.add_argument("--output", default=PROFIT_TABLE_PATH)
+    args = parser.parse_args()
+
+    table = RealizedProfitTable.build()
+    table.save(args.output)
+    print(f"Stored {table.profits.shape[0]} x {table.profits.shape[1]} realized profits in {args.output} "
+          f"({int(np.isnan(table.profits).sum())} without profit)")
@@ -0,0 +1,247 @@
+"""2nd-stage (recourse) evaluation for fixed activation decisions.
+
+Once suppliers and roasteries are fixed, every disruption scenario is an independent
+supplier -> roastery -> customer flow problem that only depends on the available
+capacity per node. Each distinct capacity state is solved once and cached.
+
+Backends:
+- "gurobi": small Gurobi MIP per capacity state.
+- "scipy": NumPy constraint matrices solved with scipy.optimize.linprog (HiGHS); needs no Gurobi env/license.
+  The flow problem is a single-commodity network (raw coffee is only split into light/dark on the
+  roastery -> customer arcs), so its LP optimum is integral and matches the Gurobi MIP.
+"""
+import contextlib
+import numpy as np
+from scipy.optimize import linprog
+
+try:
+    import gurobipy as grb
+    from llms_decision_support.python_files.env_pool import env_pool
+except Exception:
+    grb = None
+
+RECOURSE_BACKENDS = ["gurobi", "scipy"]
+
+class RecourseSolver():
+    def __init__(self, data, backend="gurobi", get_env=None):
+        """
+        Args:
+            data (dict): coffee network data (see coffee_data.py).
+            backend (str): "gurobi" or "scipy".
+            get_env (callable): returns the Gurobi env to solve in (called per solve);
+                by default, an env is checked out of env_pool per solve.
+        """
+        if backend not in RECOURSE_BACKENDS:
+            raise ValueError(f"Unknown recourse backend '{backend}' (use one of {RECOURSE_BACKENDS})")
+        self.data = data
+        self.backend = backend
+        self.suppliers = list(data['s_capacity'].keys())
+        self.roasteries = list(data['r_capacity'].keys())
+        self.customers = list(data['coffee_demand']['light'].keys())
+        self._get_env = get_env
+        self._matrices = None
+        self._cache = {}
+        self._dual_cache = {}
+
+    def available_capacities(self, fixed_s_activation, fixed_r_activation, s_defs, r_defs):
+        """Get usable capacity per node for fixed activations and one disruption pattern.
+
+        Args:
+            fixed_s_activation (dict): 0/1 per supplier, e.g. {'supplier1': 1, ...}.
+            fixed_r_activation (dict): 0/1 per roastery level, e.g. {'roastery1_low': 0, 'roastery1_high': 1, ...}.
+            s_defs (dict): True per disrupted supplier.
+            r_defs (dict): True per disrupted roastery.
+
+        Returns:
+            tuple: available capacity per supplier and per roastery (in node order).
+        """
+        s_available = tuple(
+            0 if s_defs.get(s, False) else self.data['s_capacity'][s] * fixed_s_activation.get(s, 0)
+            for s in self.suppliers
+        )
+        r_available = tuple(
+            0 if r_defs.get(r, False) else sum(
+                self.data['r_capacity'][r][lvl] * fixed_r_activation.get(f"{r}_{lvl}", 0) for lvl in self.data['r_capacity'][r]
+            )
+            for r in self.roasteries
+        )
+        return s_available, r_available
+
+    def contribution(self, s_available, r_available):
+        """Get the optimal margin contribution (revenue - variable costs) for given capacities.
+
+        Args:
+            s_available (tuple): available capacity per supplier.
+            r_available (tuple): available capacity per roastery.
+
+        Returns:
+            float: optimal contribution of the flow problem (cached per capacity state).
+        """
+        key = (tuple(s_available), tuple(r_available))
+        if key not in self._cache:
+            self._cache[key] = self._solve(*key)
+        return self._cache[key]
+
+    def _solve(self, s_available, r_available):
+        if self.backend == "scipy":
+            return self._solve_scipy(s_available, r_available)
+        return self._solve_gurobi(s_available, r_available)
+
+    def _solve_gurobi(self, s_available, r_available):
+        data = self.data
+        suppliers, roasteries, customers = self.suppliers, self.roasteries, self.customers
+        shipping_cost_s_to_r = data['shipping_cost_s_to_r']
+        shipping_cost_r_to_c = data['shipping_cost_r_to_c']
+
+        with contextlib.ExitStack() as stack:
+            if self._get_env is None:
+                model = stack.enter_context(env_pool.model())
+            else:
+                model = stack.enter_context(grb.Model(env=self._get_env()))
+            coffee_flow_raw = model.addVars(shipping_cost_s_to_r.keys(), vtype=grb.GRB.INTEGER, name="coffee_flow_raw")
+            coffee_flow_light = model.addVars(shipping_cost_r_to_c.keys(), vtype=grb.GRB.INTEGER, name="coffee_flow_light")
+            coffee_flow_dark = model.addVars(shipping_cost_r_to_c.keys(), vtype=grb.GRB.INTEGER, name="coffee_flow_dark")
+
+            model.setObjective(
+                grb.quicksum(
+                    coffee_flow_light[r, c] * (data['selling_price'] - shipping_cost_r_to_c[r, c] - data['variable_roasting_cost_light'][r])
+                    + coffee_flow_dark[r, c] * (data['selling_price'] - shipping_cost_r_to_c[r, c] - data['variable_roasting_cost_dark'][r])
+                    for r, c in shipping_cost_r_to_c
+                ) - grb.quicksum(coffee_flow_raw[s, r] * shipping_cost_s_to_r[s, r] for s, r in shipping_cost_s_to_r),
+                grb.GRB.MAXIMIZE
+            )
+
+            for s, cap in zip(suppliers, s_available):
+                _=model.addConstr(coffee_flow_raw.sum(s, '*') <= cap)
+            for r, cap in zip(roasteries, r_available):
+                _=model.addConstr(coffee_flow_light.sum(r, '*') + coffee_flow_dark.sum(r, '*') <= cap)
+                _=model.addConstr(coffee_flow_raw.sum('*', r) == coffee_flow_light.sum(r, '*') + coffee_flow_dark.sum(r, '*'))
+            for c in customers:
+                _=model.addConstr(coffee_flow_light.sum('*', c) <= data['coffee_demand']['light'][c])
+                _=model.addConstr(coffee_flow_dark.sum('*', c) <= data['coffee_demand']['dark'][c])
+
+            model.optimize()
+            return model.objVal
+
+    def _build_matrices(self):
+        """Build objective and constraint matrices of the flow problem (capacities enter as right-hand sides).
+
+        Variable order: raw flows (arcs of shipping_cost_s_to_r), then light and dark flows (arcs of shipping_cost_r_to_c).
+        Row order of the <= constraints: suppliers, roasteries, light demand, dark demand.
+        """
+        data = self.data
+        suppliers, roasteries, customers = self.suppliers, self.roasteries, self.customers
+        raw_arcs = list(data['shipping_cost_s_to_r'].keys())
+        roasted_arcs = list(data['shipping_cost_r_to_c'].keys())
+        num_raw, num_roasted = len(raw_arcs), len(roasted_arcs)
+        num_vars = num_raw + 2 * num_roasted
+        light = slice(num_raw, num_raw + num_roasted)
+        dark = slice(num_raw + num_roasted, num_vars)
+
+        contribution = np.zeros(num_vars)
+        contribution[:num_raw] = [-data['shipping_cost_s_to_r'][arc] for arc in raw_arcs]
+        contribution[light] = [data['selling_price'] - data['shipping_cost_r_to_c'][r, c] - data['variable_roasting_cost_light'][r]
+                               for r, c in roasted_arcs]
+        contribution[dark] = [data['selling_price'] - data['shipping_cost_r_to_c'][r, c] - data['variable_roasting_cost_dark'][r]
+                              for r, c in roasted_arcs]
+
+        # Incidence of arcs at their start/end nodes
+        raw_from = np.array([[s == arc[0] for arc in raw_arcs] for s in suppliers], dtype=float)
+        raw_to = np.array([[r == arc[1] for arc in raw_arcs] for r in roasteries], dtype=float)
+        roasted_from = np.array([[r == arc[0] for arc in roasted_arcs] for r in roasteries], dtype=float)
+        roasted_to = np.array([[c == arc[1] for arc in roasted_arcs] for c in customers], dtype=float)
+
+        a_ub = np.zeros((len(suppliers) + len(roasteries) + 2 * len(customers), num_vars))
+        a_ub[:len(suppliers), :num_raw] = raw_from
+        rows = slice(len(suppliers), len(suppliers) + len(roasteries))
+        a_ub[rows, light] = roasted_from
+        a_ub[rows, dark] = roasted_from
+        rows = slice(len(suppliers) + len(roasteries), len(suppliers) + len(roasteries) + len(customers))
+        a_ub[rows, light] = roasted_to
+        rows = slice(len(suppliers) + len(roasteries) + len(customers), a_ub.shape[0])
+        a_ub[rows, dark] = roasted_to
+
+        a_eq = np.zeros((len(roasteries), num_vars))
+        a_eq[:, :num_raw] = raw_to
+        a_eq[:, light] = -roasted_from
+        a_eq[:, dark] = -roasted_from
+
+        demand = np.array([data['coffee_demand']['light'][c] for c in customers] + [data['coffee_demand']['dark'][c] for c in customers], dtype=float)
+        self._matrices = (contribution, a_ub, a_eq, demand)
+
+    def _solve_scipy(self, s_available, r_available):
+        if self._matrices is None:
+            self._build_matrices()
+        contribution, a_ub, a_eq, demand = self._matrices
+        b_ub = np.concatenate([np.asarray(s_available, dtype=float), np.asarray(r_available, dtype=float), demand])
+
+        res = linprog(-contribution, A_ub=a_ub, b_ub=b_ub, A_eq=a_eq, b_eq=np.zeros(a_eq.shape[0]), method="highs")
+        if not res.success:
+            raise RuntimeError(f"Recourse problem not solved: {res.message}")
+        # Optimal vertex flows are integral; evaluate rounded flows to avoid solver tolerances in profit values
+        return float(contribution @ np.round(res.x))
+
+    def capacity_prices(self, s_available, r_available):
+        """Get the optimal contribution and dual prices of the capacities (always solved with HiGHS, which reports duals).
+
+        The contribution is concave in the capacities and bounded by any dual solution, i.e.
+        contribution(s, r) <= s_prices @ s + r_prices @ r + demand_value for all capacities (Benders optimality cut).
+
+        Args:
+            s_available (tuple): available capacity per supplier.
+            r_available (tuple): available capacity per roastery.
+
+        Returns:
+            tuple: contribution, dual price per supplier and per roastery (np.ndarray) and the value of the
+            demand duals (cached per capacity state).
+        """
+        key = (tuple(s_available), tuple(r_available))
+        if key not in self._dual_cache:
+            if self._matrices is None:
+                self._build_matrices()
+            contribution, a_ub, a_eq, demand = self._matrices
+            b_ub = np.concatenate([np.asarray(s_available, dtype=float), np.asarray(r_available, dtype=float), demand])
+            res = linprog(-contribution, A_ub=a_ub, b_ub=b_ub, A_eq=a_eq, b_eq=np.zeros(a_eq.shape[0]), method="highs")
+            if not res.success:
+                raise RuntimeError(f"Recourse problem not solved: {res.message}")
+            # Marginals refer to the minimized negative contribution
+            prices = -res.ineqlin.marginals
+            num_s, num_r = len(self.suppliers), len(self.roasteries)
+            self._dual_cache[key] = (float(contribution @ np.round(res.x)), prices[:num_s], prices[num_s:num_s + num_r],
+                                     float(prices[num_s + num_r:] @ demand))
+        return self._dual_cache[key]
+
+    def fixed_costs(self, fixed_s_activation, fixed_r_activation):
+        """Get scenario-independent (1st-stage) costs of the activation decisions.
+
+        Args:
+            fixed_s_activation (dict): 0/1 per supplier.
+            fixed_r_activation (dict): 0/1 per roastery level.
+
+        Returns:
+            float: fixed supplier and roasting costs.
+        """
+        data = self.data
+        return (
+            sum(data['fixed_supplier_cost'][s] * fixed_s_activation.get(s, 0) for s in self.suppliers)
+            + sum(data['fixed_roasting_cost'][r][lvl] * fixed_r_activation.get(f"{r}_{lvl}", 0)
+                  for r in self.roasteries for lvl in data['r_capacity'][r])
+        )
+
+    def profit_per_scenario(self, fixed_s_activation, fixed_r_activation, scenarios):
+        """Evaluate fixed activation decisions scenario by scenario.
+
+        Args:
+            fixed_s_activation (dict): 0/1 per supplier.
+            fixed_r_activation (dict): 0/1 per roastery level.
+            scenarios (list): (supplier defaults, roastery defaults) tuples of dicts.
+
+        Returns:
+            dict: profit per scenario index.
+        """
+        fixed_costs = self.fixed_costs(fixed_s_activation, fixed_r_activation)
+        return {
+            n: self.data['fixed_income_bonuspool'] - fixed_costs + self.contribution(
+                *self.available_capacities(fixed_s_activation, fixed_r_activation, s_defs, r_defs))
+            for n, (s_defs, r_defs) in enumerate(scenarios)
+        }
@@ -0,0 +1,142 @@
+"""Binary table of the profit scenarios and probabilities of all activation combinations.
+
+Written by the export step (see coffee_stochastic_csv_and_json_export.py) next to
+scenarios_and_probabilities.json, as one structured NumPy array with a fixed row layout:
+row i holds the i-th decision key of decisions.all_decision_keys() (the decision code), its decisions
+string, the number of profit scenarios and the (padded) profit and probability arrays. The file is
+memory-mapped on first access; rows are found by their decision code without parsing the whole table.
+
+The format version is part of the file name, so a changed layout never loads an old file.
+"""
+from collections.abc import Mapping
+import json
+import os
+import threading
+import numpy as np
+from llms_decision_support.python_files.decisions import ROASTERY_LEVELS, key_from_decisions_str
+
+# Change when the row layout changes (part of the file name)
+SCENARIO_TABLE_VERSION = 1
+SCENARIO_TABLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data_files",
+                                   f"scenarios_and_probabilities.v{SCENARIO_TABLE_VERSION}.npy")
+SCENARIOS_JSON_PATH = os.path.join(os.path.dirname(SCENARIO_TABLE_PATH), "scenarios_and_probabilities.json")
+
+def parse_scenarios(value):
+    """Parse a scenarios string of the data files, e.g. '5125: 0.613; 1060: 0.309', into {profit: probability}.
+    """
+    return {int(k.strip()): float(v) for k, v in (item.split(": ") for item in value.split("; "))}
+
+def round_shares(shares):
+    """Round probabilities to whole percent such that they sum up to 100% (largest remainders are rounded up).
+    """
+    # total = sum(shares.values())
+    rounded_shares = {k: round(v, 2) for k, v in shares.items()}  # Initial rounding
+    remainder = round(1.00 - sum(rounded_shares.values()), 2)  # Compute remainder
+
+    # Compute decimal remainders for ranking
+    remainders = sorted(shares.keys(), key=lambda k: shares[k] - rounded_shares[k], reverse=True)
+
+    # Distribute the remainder (add or subtract 0.01 to highest remainders)
+    for i in range(int(remainder * 100)):  # Convert to cent units
+        rounded_shares[remainders[i]] += 0.01  # Adjust top remainders first
+
+    return rounded_shares
+
+def decision_code(decision_key, num_suppliers):
+    """Get the row of a decision key in decisions.all_decision_keys() (mixed radix: 2 per supplier, levels + 1 per roastery).
+    """
+    code = 0
+    for i, value in enumerate(decision_key):
+        code = code * (2 if i < num_suppliers else len(ROASTERY_LEVELS) + 1) + value
+    return code
+
+def write_scenario_table(scenarios_by_decisions, path=SCENARIO_TABLE_PATH):
+    """Write the table (to a temporary file that is moved into place).
+
+    Args:
+        scenarios_by_decisions (dict): {decisions string: {profit: probability}} of all decision keys,
+            in the order of decisions.all_decision_keys().
+        path (str): target file.
+    """
+    width = max(len(scenarios) for scenarios in scenarios_by_decisions.values())
+    dtype = np.dtype([("decisions_str", f"U{max(len(key) for key in scenarios_by_decisions)}"), ("count", "i4"),
+                      ("profits", "f8", (width,)), ("probs", "f8", (width,))])
+    table = np.zeros(len(scenarios_by_decisions), dtype=dtype)
+    for row, (decisions_str, scenarios) in zip(table, scenarios_by_decisions.items()):
+        row["decisions_str"], row["count"] = decisions_str, len(scenarios)
+        row["profits"][:len(scenarios)] = list(scenarios.keys())
+        row["probs"][:len(scenarios)] = list(scenarios.values())
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.save(f, table)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+class ScenarioProbsView(Mapping):
+    """Read-only {decisions string: {profit: rounded probability}} view (as formerly parsed from the JSON file).
+
+    Nothing is read before the first access. Without a table file (e.g. not exported yet), the JSON file is parsed instead.
+    """
+    def __init__(self, num_suppliers, path=SCENARIO_TABLE_PATH, json_path=SCENARIOS_JSON_PATH):
+        """
+        Args:
+            num_suppliers (int): number of suppliers (to get the decision code of a decisions string).
+            path (str): table file.
+            json_path (str): fallback scenarios_and_probabilities.json.
+        """
+        self.num_suppliers = num_suppliers
+        self.path = path
+        self.json_path = json_path
+        self._table = None
+        self._json = None
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._table is None and self._json is None:
+                if os.path.exists(self.path):
+                    self._table = np.load(self.path, mmap_mode="r")
+                else:
+                    with open(self.json_path, "r") as f:
+                        self._json = json.load(f)
+
+    def _scenarios(self, decisions_str):
+        """Get the unrounded {profit: probability} of a decisions string (KeyError if unknown).
+        """
+        if self._table is None and self._json is None:
+            self._load()
+        if self._json is not None:
+            return parse_scenarios(self._json[decisions_str])
+        try:
+            code = decision_code(key_from_decisions_str(decisions_str, self.num_suppliers), self.num_suppliers)
+        except (ValueError, IndexError):
+            raise KeyError(decisions_str) from None
+        if not 0 <= code < len(self._table) or self._table["decisions_str"][code] != decisions_str:
+            raise KeyError(decisions_str)
+        row = self._table[code]
+        count = int(row["count"])
+        return {int(profit): float(prob) for profit, prob in zip(row["profits"][:count], row["probs"][:count])}
+
+    def __getitem__(self, decisions_str):
+        entry = self._entries.get(decisions_str)
+        if entry is None:
+            entry = round_shares(self._scenarios(decisions_str))
+            self._entries[decisions_str] = entry
+        # Copy, so callers cannot change the cached entry
+        return dict(entry)
+
+    def _keys(self):
+        if self._table is None and self._json is None:
+            self._load()
+        return list(self._json) if self._json is not None else [str(key) for key in self._table["decisions_str"]]
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
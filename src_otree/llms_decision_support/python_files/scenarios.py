@@ -0,0 +1,170 @@
+"""Disruption scenario generation shared by the stochastic models.
+
+Disruptions are independent Bernoulli draws per node. Scenarios are returned as
+unique (supplier defaults, roastery defaults) patterns with their probabilities:
+- "sampled": seeded Monte Carlo sample (as used for the published experiment numbers),
+  identical patterns collapsed into one weighted scenario.
+- "exact": all 2^k disruption patterns of the k nodes with nonzero default probability,
+  each weighted by its product probability.
+"""
+from fractions import Fraction
+import itertools
+import numpy as np
+
+SCENARIO_MODES = ["sampled", "exact"]
+SAMPLERS = ["legacy", "default_rng"]
+
+def sample_disruption_matrix(default_probs, num_scenarios=1000, seed=42, sampler="legacy"):
+    """Draw disruptions of all nodes and scenarios in one vectorized call.
+
+    Args:
+        default_probs (array-like): default probability per node.
+        num_scenarios (int): number of scenarios to draw.
+        seed (int): RNG seed.
+        sampler (str): "legacy" (RandomState; with seed 42 bit-for-bit the stream of the published numbers,
+            which drew np.random.rand() node by node, scenario by scenario) or "default_rng" (numpy Generator).
+
+    Returns:
+        np.ndarray: (num_scenarios, nodes) boolean matrix, True for a disruption.
+    """
+    default_probs = np.asarray(default_probs, dtype=float)
+    if sampler == "legacy":
+        # Row-major draws reproduce the former per-scenario, per-node order
+        draws = np.random.RandomState(seed).random_sample((num_scenarios, len(default_probs)))
+    elif sampler == "default_rng":
+        draws = np.random.default_rng(seed).random((num_scenarios, len(default_probs)))
+    else:
+        raise ValueError(f"Unknown sampler '{sampler}' (use one of {SAMPLERS})")
+    return draws < default_probs
+
+def scenarios_from_matrix(disruptions, suppliers, roasteries):
+    """Convert a disruption matrix (columns: suppliers, then roasteries) into (supplier defaults, roastery defaults) tuples of dicts.
+    """
+    suppliers, roasteries = [str(s) for s in suppliers], [str(r) for r in roasteries]
+    return [
+        (dict(zip(suppliers, map(bool, row[:len(suppliers)]))), dict(zip(roasteries, map(bool, row[len(suppliers):]))))
+        for row in disruptions
+    ]
+
+def sample_scenarios(s_default_prob, r_default_prob, num_scenarios=1000, seed=42, sampler="legacy"):
+    """Draw disruption scenarios (see sample_disruption_matrix()).
+
+    Args:
+        s_default_prob (dict): default probability per supplier.
+        r_default_prob (dict): default probability per roastery.
+        num_scenarios (int): number of scenarios to draw.
+        seed (int): RNG seed (42 with the legacy sampler reproduces the published numbers).
+        sampler (str): "legacy" or "default_rng".
+
+    Returns:
+        list: (supplier defaults, roastery defaults) tuples of dicts, one per scenario.
+    """
+    disruptions = sample_disruption_matrix(list(s_default_prob.values()) + list(r_default_prob.values()), num_scenarios, seed, sampler)
+    return scenarios_from_matrix(disruptions, s_default_prob, r_default_prob)
+
+def aggregate_disruption_matrix(disruptions):
+    """Collapse identical rows of a disruption matrix.
+
+    Returns:
+        tuple: unique rows (in order of first occurrence) and their occurrence counts.
+    """
+    if disruptions.shape[1] < 63:
+        # Rows as bit patterns (1-D unique is much faster than unique rows)
+        codes = disruptions.astype(np.int64) @ (np.int64(1) << np.arange(disruptions.shape[1], dtype=np.int64))
+        _, first_index, counts = np.unique(codes, return_index=True, return_counts=True)
+    else:
+        _, first_index, counts = np.unique(disruptions, axis=0, return_index=True, return_counts=True)
+    order = np.argsort(first_index)
+    return disruptions[first_index[order]], counts[order]
+
+def enumerate_scenarios(s_default_prob, r_default_prob):
+    """Enumerate all disruption patterns of the nodes with nonzero default probability.
+
+    Args:
+        s_default_prob (dict): default probability per supplier.
+        r_default_prob (dict): default probability per roastery.
+
+    Returns:
+        tuple: scenarios ((supplier defaults, roastery defaults) tuples of dicts) and their exact probabilities (Fraction).
+    """
+    # Fractions keep the product probabilities exact (e.g. 0.7 * 0.9 == 0.63) when summed up later on
+    probs = {node: Fraction(prob).limit_denominator(10**9) for node, prob in (s_default_prob | r_default_prob).items()}
+    risky_nodes = [node for node, prob in probs.items() if prob > 0]
+
+    scenarios = []
+    scenario_probs = []
+    for outcome in itertools.product([False, True], repeat=len(risky_nodes)):
+        defaults = dict(zip(risky_nodes, outcome))
+        scenario_prob = Fraction(1)
+        for node, default in defaults.items():
+            scenario_prob *= probs[node] if default else 1 - probs[node]
+        scenarios.append((
+            {s: defaults.get(s, False) for s in s_default_prob},
+            {r: defaults.get(r, False) for r in r_default_prob},
+        ))
+        scenario_probs.append(scenario_prob)
+    return scenarios, scenario_probs
+
+def generate_scenarios(s_default_prob, r_default_prob, scenario_mode="sampled", num_scenarios=1000, seed=42, aggregate=True, sampler="legacy"):
+    """Get weighted disruption scenarios for the given mode.
+
+    Args:
+        s_default_prob (dict): default probability per supplier.
+        r_default_prob (dict): default probability per roastery.
+        scenario_mode (str): "sampled" (seeded Monte Carlo) or "exact" (full enumeration).
+        num_scenarios (int): number of sampled scenarios (only for "sampled").
+        seed (int): seed for the sampler (only for "sampled").
+        aggregate (bool): collapse identical sampled patterns (only for "sampled").
+        sampler (str): "legacy" (published numbers) or "default_rng" (only for "sampled").
+
+    Returns:
+        tuple: scenarios ((supplier defaults, roastery defaults) tuples of dicts)
+        and their probabilities (Fraction; summing up to 1).
+    """
+    if scenario_mode == "exact":
+        return enumerate_scenarios(s_default_prob, r_default_prob)
+    if scenario_mode != "sampled":
+        raise ValueError(f"Unknown scenario mode '{scenario_mode}' (use one of {SCENARIO_MODES})")
+
+    disruptions = sample_disruption_matrix(list(s_default_prob.values()) + list(r_default_prob.values()), num_scenarios, seed, sampler)
+    if aggregate:
+        disruptions, counts = aggregate_disruption_matrix(disruptions)
+    else:
+        counts = [1] * num_scenarios
+    return scenarios_from_matrix(disruptions, s_default_prob, r_default_prob), [Fraction(int(count), num_scenarios) for count in counts]
+
+def profit_occurrences(profit_per_scenario, scenario_probs):
+    """Get probabilities of unique profit values, sorted by profit (descending).
+
+    Args:
+        profit_per_scenario (dict or array-like): profit value per scenario index.
+        scenario_probs (list): probability per scenario index.
+
+    Returns:
+        dict: profit values and their probabilities.
+    """
+    if isinstance(profit_per_scenario, dict):
+        scenario_indices, profits = list(profit_per_scenario.keys()), list(profit_per_scenario.values())
+    else:
+        scenario_indices, profits = range(len(profit_per_scenario)), profit_per_scenario
+    unique_profits, inverse = np.unique(np.asarray(profits, dtype=float), return_inverse=True)
+    # Probabilities are summed up as given (Fractions stay exact) per unique profit value
+    probs = np.empty(len(scenario_indices), dtype=object)
+    probs[:] = [scenario_probs[n] for n in scenario_indices]
+    shares = np.zeros(len(unique_profits), dtype=object)
+    np.add.at(shares, inverse.reshape(-1), probs)
+    return {float(profit): float(share) for profit, share in zip(unique_profits[::-1], shares[::-1])}
+
+def distribution_statistics(profit_probs):
+    """Get expected value, standard deviation and coefficient of variation of a profit distribution.
+
+    Args:
+        profit_probs (dict): profit values and their probabilities.
+
+    Returns:
+        tuple: EV, SD and CV (SD / EV; 0 if EV is 0).
+    """
+    ev = sum(profit * prob for profit, prob in profit_probs.items())
+    sd = float(np.sqrt(sum(prob * (profit - ev) ** 2 for profit, prob in profit_probs.items())))
+    cv = sd / ev if ev != 0 else 0.0
+    return ev, sd, cv
@@ -2,16 +2,13 @@ from otree.api import *
 from llms_decision_support.python_files.constants import C
 from .. import Player
 from .. import players_agent_dict
-from llms_decision_support.python_files.coffee_deterministic_evaluation import evaluate_deterministic
+from llms_decision_support.python_files.realized_profit_table import realized_profit
 from autogen.agentchat import UserProxyAgent
 from .optiguide_extended import OptiGuideAgent      # local modified version
-from .optiguide_extended import _replace
 import json
 import numpy as np
-from pathlib import Path
-import sys
+import os
 from datetime import datetime
-from io import StringIO
 
 class DummyAgent:
     """Empty hull with necessary variables in case LLM access is disabled.
@@ -49,6 +46,9 @@ def setup_llm_framework(player: Player):
     global players_agent_dict
     participant_id = get_participant_id(player)
 
+    # API key for the LLM client (key file read on first use, see C.OPENAI_API_KEY)
+    os.environ["OPENAI_API_KEY"] = C.OPENAI_API_KEY
+
     # Create agent setting
     players_agent_dict[participant_id] = {}
 
@@ -213,16 +213,15 @@ def calculate_realized_profit(player: Player):
 
     player.p1_realized_disruptions = json.dumps(p1_realized_disruptions)
 
-    result = evaluate_deterministic(decisions, p1_realized_disruptions)
+    result = realized_profit(decisions, p1_realized_disruptions)
 
     return result
 
-def get_provided_solution(player, disruption_risks_info):
-    """Get solution that is provided ex-ante to participants.
+def get_provided_solution(player):
+    """Get solution that is provided ex-ante to participants (the configured solution, see C.CUSTOM_TEST_CHOICES).
 
     Args:
         player (Player): Reference to experiment participant.
-        disruption_risks_info (str): Flattened dictionary of nodes with disruption risk.
 
     Returns:
         result (dict): A dictionary containing
@@ -231,75 +230,22 @@ def get_provided_solution(player, disruption_risks_info):
             - "profit" (str): Expected profit for this solution.
     """
     result = {}
-    
-    if C.FLAG_CALCULATE_PROVIDED_SOLUTION == True:
-        stoch_prog_filename = f"coffee_stochastic_evaluation.py"
-
-        try:
-            code_path = Path(__file__).with_name(stoch_prog_filename)
-        except:
-            route_dir = Path.cwd()
-            code_path = fr"{route_dir}\llms_decision_support\{stoch_prog_filename}"
-        source_code = open(code_path, "r").read()
-        locals_dict = {}
-        locals_dict.update(globals())
-        locals_dict.update(locals())
-
-        old_code = "disruption_risks_info = {}"
-        new_code = "disruption_risks_info = " + json.dumps(disruption_risks_info)
-        updated_source_code = _replace(source_code, old_code, new_code)
-
-        # Save the original stdout and stderr
-        original_stdout = sys.stdout
-
-        # Suppress output by redirecting stdout and stderr
-        sys.stdout = StringIO()
-
-        try:
-            exec(updated_source_code, locals_dict, locals_dict)
-        finally:
-            # Restore original stdout and stderr
-            sys.stdout = original_stdout
-        
-        p1_provided_decisions = dict.fromkeys(list(C.SUPPLIERS) + list(C.ROASTERIES))
-        if True:
-            model = locals_dict["model"]
-            supplier_activation = locals_dict["supplier_activation"]
-            roastery_activation = locals_dict["roastery_activation"]
-
-            for s in C.SUPPLIERS:
-                if supplier_activation[s].X:
-                    p1_provided_decisions[s] = "activate"
-                else:
-                    p1_provided_decisions[s] = "do not activate"
-            for r in C.ROASTERIES:
-                if roastery_activation[(r, 'low')].X + roastery_activation[(r, 'high')].X == 0:
-                    p1_provided_decisions[r] = "do not activate"
-                elif roastery_activation[(r, 'low')].X == 1:
-                    p1_provided_decisions[r] = 'activate (low)'
-                elif roastery_activation[(r, 'high')].X == 1:
-                    p1_provided_decisions[r] = 'activate (high)'
-            result["decisions"] = p1_provided_decisions
-            player.p1_provided_decisions = json.dumps(p1_provided_decisions)
-
-            result["profit"] = "{:,}".format(int(np.round(model.objVal)))
-    else:
-        result["decisions"] = {
-            'supplier1': "activate",
-            'supplier2': "do not activate",
-            'supplier3': "activate",
-            'roastery1': "activate (high)",
-            'roastery2': "do not activate",
-        }
-        sp_solution_id = 1
-        sp_solution_info = next((item for item in C.CUSTOM_TEST_CHOICES if item['id'] == sp_solution_id), None)
-        sp_solution_scenarios = sp_solution_info["scenarios"]
-        result["provided_scenarios"] = {
-            f"{(key):,.0f}": value for key, value in sp_solution_scenarios.items()
-        }
-        result["profit"] = sp_solution_info["ev"]
-        player.p1_provided_scenarios = json.dumps(result["provided_scenarios"])
-        player.p1_provided_decisions = json.dumps(result["decisions"])
+    result["decisions"] = {
+        'supplier1': "activate",
+        'supplier2': "do not activate",
+        'supplier3': "activate",
+        'roastery1': "activate (high)",
+        'roastery2': "do not activate",
+    }
+    sp_solution_id = 1
+    sp_solution_info = next((item for item in C.CUSTOM_TEST_CHOICES if item['id'] == sp_solution_id), None)
+    sp_solution_scenarios = sp_solution_info["scenarios"]
+    result["provided_scenarios"] = {
+        f"{(key):,.0f}": value for key, value in sp_solution_scenarios.items()
+    }
+    result["profit"] = sp_solution_info["ev"]
+    player.p1_provided_scenarios = json.dumps(result["provided_scenarios"])
+    player.p1_provided_decisions = json.dumps(result["decisions"])
     return result
 
 def update_payoff_uq_bonus(player: Player, page_name_str: Page):
@@ -469,24 +415,11 @@ def get_p2_decisions_str(decisions_id:int):
     """Get standardized string representation for Part 2 decision.
 
     Args:
-        decisions_dict (dict): Dictionary of chosen decisions (which nodes to activate;
-        based on the chosen corresponding payout scheme).
+        decisions_id (int): Reference to chosen payout scheme for Part 2
+        (decisions of the corresponding non-dominated solution, see C.CUSTOM_TEST_CHOICES).
 
     Returns:
         result (str): standardized string of Part 2 decision.
     """
-    result = None
-
-    ROUND = 0.000000001
-    CUSTOM_TEST_CHOICES = [
-        {'id': 1, 'ev': '$4,253', "cv": "29%", "sd": "$1,242", "scenarios": {4800: 0.613-ROUND, 4380: 0.285+ROUND, 610: 0.102}, 'decisions': "S1    S3   R1-h     "},
-        {'id': 2, 'ev': "$4,250", "cv": "16%", "sd": "$678", "scenarios": {4690: 0.613-ROUND, 3925: 0.285+ROUND, 2600: 0.078, 2225: 0.024}, 'decisions': "S1    S3   R1-l R2-l"},
-        {'id': 3, 'ev': "$4,208", "cv": "9%", "sd": "$385", "scenarios": {4490: 0.613-ROUND, 4110: 0.078, 3725: 0.285+ROUND, 3050: 0.024}, 'decisions': "   S2 S3   R1-l R2-h"},
-        {'id': 4, 'ev': "$4,148", "cv": "6%", "sd": "$228", "scenarios": {4225: 0.898, 3470: 0.102}, 'decisions': "   S2 S3   R1-l R2-h"},
-        {'id': 5, 'ev': "$3,938", "cv": "4%", "sd": "$151", "scenarios": {3990: 0.613-ROUND, 3975: 0.285+ROUND, 3610: 0.078, 3220: 0.024}, 'decisions': "S1 S2 S3   R1-l R2-h"},
-        {'id': 6, 'ev': "$3,870", "cv": "0%", "sd": "$0", "scenarios": {3870: 1.0}, 'decisions': "   S2 S3        R2-h"},
-    ]
-    for i in range(len(CUSTOM_TEST_CHOICES)):
-        if CUSTOM_TEST_CHOICES[i]['id'] == decisions_id:
-            result = CUSTOM_TEST_CHOICES[i]['decisions'].replace(" ", "_")
-    return result
\ No newline at end of file
+    choice = next((item for item in C.CUSTOM_TEST_CHOICES if item['id'] == decisions_id), None)
+    return choice['decisions'] if choice else None
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""Warm-up of the solver models in the server process.
+
+Started once when the server creates a session (creating_session in __init__.py), so the first participant
+question does not pay for building the stochastic model, Gurobi env/license checks, caches and lazily loaded constants.
+Runs in a background thread; evaluations requested meanwhile fall back to the (thread-safe) lazy initialization.
+"""
+import threading
+import time
+from llms_decision_support.python_files.coffee_data import get_coffee_network_data
+from llms_decision_support.python_files.coffee_deterministic_evaluation import evaluate_deterministic, evaluator_pool
+from llms_decision_support.python_files.coffee_stochastic_evaluation import StochasticModel
+from llms_decision_support.python_files.constants import C
+from llms_decision_support.python_files.lazy_constants import preload_constants
+from llms_decision_support.python_files.realized_profit_table import get_profit_table
+
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+_warmup_done = threading.Event()
+warmup_status = {"ready": False, "error": None, "constants_errors": None, "duration_in_s": None}
+
+def _warm_up():
+    start_time = time.perf_counter()
+    try:
+        # Lazy constants (key file, model source, prompts); C.MODULE is left to first use, since the app
+        # module is still being imported when the warm-up starts
+        warmup_status["constants_errors"] = preload_constants(C, ["OPENAI_API_KEY", "SRC_CODE_STOCH", "EXAMPLE_QA", "HELPER_DOC"])
+
+        # Realized-profit table (Part 1 payouts)
+        get_profit_table()
+
+        # Stochastic model (reference instance + pool), results cache and cached optimum
+        StochasticModel.get_reference_model()
+        StochasticModel.prewarm_cache()
+        StochasticModel.get_stochastic_optimum()
+        setup = (lambda model: model.build_extensive_form()) if StochasticModel.evaluation_engine == "monolithic" else None
+        StochasticModel.model_pool.prefill(setup)
+
+        # Deterministic models (built once per pooled evaluator) and a first solve
+        evaluator_pool.prefill()
+        data = get_coffee_network_data()
+        decisions = {s: "activate" for s in data['s_capacity']} | {r: "activate (high)" for r in data['r_capacity']}
+        no_disruptions = {node: False for node in decisions}
+        evaluate_deterministic(decisions, no_disruptions)
+    except Exception as e:
+        # Lazy initialization on first use takes over
+        warmup_status["error"] = repr(e)
+    finally:
+        warmup_status["duration_in_s"] = time.perf_counter() - start_time
+        warmup_status["ready"] = True
+        _warmup_done.set()
+
+def start_warmup():
+    """Start the warm-up in a background thread (only once per process).
+    """
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_warm_up, name="solver-warmup", daemon=True)
+            _warmup_thread.start()
+
+def is_warmup_ready():
+    """Check whether the warm-up has finished (successfully or not, see warmup_status).
+    """
+    return _warmup_done.is_set()
+
+def wait_for_warmup(timeout=None):
+    """Block until the warm-up has finished.
+
+    Args:
+        timeout (float): maximum seconds to wait (None: wait indefinitely).
+
+    Returns:
+        bool: True if the warm-up has finished.
+    """
+    return _warmup_done.wait(timeout)
@@ -0,0 +1,22 @@
+"""Test setup: import the app package for its solver modules only (see python_files/export_worker.py),
+so the tests run without an oTree installation.
+
+Usage (from src_otree):
+    python -m pytest tests
+Tests of the Gurobi engines are skipped without gurobipy (a size-limited license suffices).
+"""
+import os
+import sys
+import pytest
+
+os.environ.setdefault("LLMS_DECISION_SUPPORT_SOLVER_PROCESS", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(autouse=True, scope="session")
+def _artifact_cache_dir(tmp_path_factory):
+    """Write solver artifacts of the tests to a temporary directory (not into the shared artifact cache).
+    """
+    from llms_decision_support.python_files.artifact_cache import artifact_cache
+    directory, artifact_cache.directory = artifact_cache.directory, str(tmp_path_factory.mktemp("artifact_cache"))
+    yield
+    artifact_cache.directory = directory
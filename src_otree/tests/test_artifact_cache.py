@@ -0,0 +1,44 @@
+import os
+import pytest
+from llms_decision_support.python_files.artifact_cache import ArtifactCache
+from llms_decision_support.python_files.coffee_data import get_coffee_network_data
+
+def _scenarios(cache, **settings):
+    data = get_coffee_network_data()
+    return cache.scenarios(data['s_default_prob'], data['r_default_prob'], **settings)
+
+@pytest.mark.parametrize("scenario_mode", ["sampled", "exact"])
+def test_stored_scenarios_equal_generated(tmp_path, scenario_mode):
+    cache = ArtifactCache(directory=str(tmp_path))
+    generated = _scenarios(cache, scenario_mode=scenario_mode)
+    assert len(os.listdir(tmp_path)) == 1
+    assert _scenarios(cache, scenario_mode=scenario_mode) == generated
+
+def test_settings_are_stored_separately(tmp_path):
+    cache = ArtifactCache(directory=str(tmp_path))
+    _scenarios(cache, num_scenarios=1000)
+    _scenarios(cache, num_scenarios=500)
+    _scenarios(cache, num_scenarios=1000, aggregate=False)
+    assert len(os.listdir(tmp_path)) == 3
+
+def test_disabled_cache_writes_nothing(tmp_path):
+    _scenarios(ArtifactCache(directory=str(tmp_path), enabled=False))
+    assert os.listdir(tmp_path) == []
+
+def test_stored_model_equals_built(tmp_path):
+    pytest.importorskip("gurobipy")
+    from llms_decision_support.python_files.env_pool import env_pool
+    cache = ArtifactCache(directory=str(tmp_path))
+    data = get_coffee_network_data()
+    scenarios, scenario_probs = _scenarios(cache)
+    objectives = []
+    with env_pool.checkout() as env:
+        # Built (and stored), then read from the .mps file
+        for _ in range(2):
+            model, variables = cache.extensive_form(env, data, scenarios, scenario_probs)
+            model.optimize()
+            objectives.append((model.ObjVal, variables['x'].X.round().tolist()))
+            model.dispose()
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".mps")]) == 1
+    assert objectives[1][0] == pytest.approx(objectives[0][0])
+    assert objectives[1][1] == objectives[0][1]
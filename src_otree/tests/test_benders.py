@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("gurobipy")
+
+from llms_decision_support.python_files.benders import BendersSolver
+from llms_decision_support.python_files.coffee_stochastic_evaluation import StochasticModel
+from llms_decision_support.python_files.decisions import all_decision_keys
+from llms_decision_support.python_files.instance_generator import generate_network_data
+
+def _enumeration_optimum(stoch_model):
+    keys = all_decision_keys(len(stoch_model.suppliers), len(stoch_model.roasteries))
+    return max(stoch_model.evaluate_decision_keys(keys), key=lambda result: result["ev"])
+
+@pytest.mark.parametrize("scenario_mode", ["sampled", "exact"])
+def test_benders_equals_enumeration(scenario_mode):
+    with StochasticModel(scenario_mode=scenario_mode) as stoch_model:
+        benders = BendersSolver(stoch_model.data, stoch_model.scenarios, stoch_model.scenario_probs).solve(stoch_model.get_env())
+        optimum = _enumeration_optimum(stoch_model)
+    assert benders["ev"] == pytest.approx(optimum["ev"], rel=1e-6)
+
+def test_benders_equals_enumeration_on_generated_instance():
+    data = generate_network_data(4, 2, 4, 4, 500, seed=1)
+    with StochasticModel(data=data) as stoch_model:
+        benders = BendersSolver(data, stoch_model.scenarios, stoch_model.scenario_probs, workers=2).solve(stoch_model.get_env())
+        optimum = _enumeration_optimum(stoch_model)
+        # EV of the Benders activations, evaluated like all other decisions
+        benders_result = stoch_model.evaluate_decision_keys([benders["decision_key"]])[0]
+    assert benders["ev"] == pytest.approx(optimum["ev"], rel=1e-6)
+    assert benders_result["ev"] == pytest.approx(optimum["ev"], rel=1e-6)
+
+def test_optimization_methods_agree(monkeypatch):
+    optima = {}
+    for method in ["enumeration", "benders"]:
+        StochasticModel.optima_cache.clear()
+        monkeypatch.setattr(StochasticModel, "optimization_method", method)
+        with StochasticModel() as stoch_model:
+            optima[method] = stoch_model.stochastic_optimum()
+    StochasticModel.optima_cache.clear()
+    assert optima["benders"]["ev"] == pytest.approx(optima["enumeration"]["ev"])
+    assert optima["benders"]["scenarios"] == pytest.approx(optima["enumeration"]["scenarios"])
@@ -0,0 +1,48 @@
+import pytest
+from llms_decision_support.python_files.decisions import (
+    all_decision_keys, canonical_decision_key, decisions_from_key, decisions_str_from_key, key_from_decisions_str)
+
+SUPPLIERS = ["supplier1", "supplier2", "supplier3"]
+ROASTERIES = ["roastery1", "roastery2"]
+DECISIONS = {"supplier1": "activate", "supplier2": "do not activate", "supplier3": "activate",
+             "roastery1": "activate (low)", "roastery2": "activate (high)"}
+
+def test_canonical_key():
+    assert canonical_decision_key(DECISIONS, SUPPLIERS, ROASTERIES) == (1, 0, 1, 1, 2)
+
+def test_wordings_share_one_key():
+    variants = [
+        {"Supplier1": "Activate", "supplier2": "no", "SUPPLIER3": True, "roastery1": "Activate (LOW)", "roastery2": "high"},
+        # Node name as value (ICL example)
+        DECISIONS | {"supplier3": "supplier3", "supplier2": "don't activate"},
+        DECISIONS | {"supplier1": 1, "supplier2": 0, "supplier3": 1.0},
+    ]
+    for decisions in variants:
+        assert canonical_decision_key(decisions, SUPPLIERS, ROASTERIES) == (1, 0, 1, 1, 2)
+
+def test_node_order_follows_network():
+    reversed_decisions = dict(reversed(list(DECISIONS.items())))
+    assert canonical_decision_key(reversed_decisions, SUPPLIERS, ROASTERIES) == (1, 0, 1, 1, 2)
+
+@pytest.mark.parametrize("decisions, message", [
+    ({node: decision for node, decision in DECISIONS.items() if node != "roastery2"}, "Missing decisions"),
+    (DECISIONS | {"roastery1": "activate"}, "lacks a level"),
+    (DECISIONS | {"supplier2": "maybe"}, "Unknown decision"),
+    (DECISIONS | {"roastery3": "activate (low)"}, "Unknown nodes"),
+])
+def test_invalid_decisions_raise(decisions, message):
+    with pytest.raises(ValueError, match=message):
+        canonical_decision_key(decisions, SUPPLIERS, ROASTERIES)
+
+def test_all_keys_round_trip():
+    keys = all_decision_keys(len(SUPPLIERS), len(ROASTERIES))
+    assert len(keys) == len(set(keys)) == 72
+    for key in keys:
+        assert canonical_decision_key(decisions_from_key(key, SUPPLIERS, ROASTERIES), SUPPLIERS, ROASTERIES) == key
+        assert key_from_decisions_str(decisions_str_from_key(key, len(SUPPLIERS)), len(SUPPLIERS)) == key
+
+def test_decisions_str():
+    # As in the data files (see all_combinations_scenarios_input.csv)
+    assert decisions_str_from_key((1, 0, 1, 1, 2), 3) == "S1____S3___R1-l_R2-h"
+    assert decisions_str_from_key((0, 1, 0, 0, 2), 3) == "___S2___________R2-h"
+    assert decisions_str_from_key((0, 0, 0, 0, 0), 3) == "____________________"
@@ -0,0 +1,41 @@
+import pytest
+from llms_decision_support.python_files.evaluation_cache import EvaluationCache
+
+def test_least_recently_used_entries_are_dropped():
+    cache = EvaluationCache(maxsize=2)
+    cache.put("model", (1, 0), {100.0: 1.0})
+    cache.put("model", (0, 1), {200.0: 1.0})
+    assert cache.get("model", (1, 0)) == {100.0: 1.0}
+    cache.put("model", (1, 1), {300.0: 1.0})
+    assert len(cache) == 2
+    assert cache.get("model", (0, 1)) is None
+    assert cache.get("model", (1, 0)) == {100.0: 1.0}
+    assert (cache.hits, cache.misses) == (2, 1)
+
+def test_entries_are_separated_by_model_hash():
+    cache = EvaluationCache()
+    cache.put("model", (1, 0), {100.0: 1.0})
+    assert cache.get("changed model", (1, 0)) is None
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == cache.misses == 0
+
+def test_wordings_share_one_entry():
+    pytest.importorskip("gurobipy")
+    from llms_decision_support.python_files.coffee_stochastic_evaluation import StochasticModel
+    StochasticModel.results_cache.clear()
+    decisions = {"supplier1": "activate", "supplier2": "do not activate", "supplier3": "activate",
+                 "roastery1": "activate (low)", "roastery2": "activate (high)"}
+    result = StochasticModel.evaluate_stochastic(decisions)
+    assert StochasticModel.evaluate_stochastic(decisions | {"supplier3": "supplier3", "supplier2": "no"}) == result
+    assert len(StochasticModel.results_cache) == 1
+    assert StochasticModel.results_cache.hits == 1
+
+def test_prewarmed_results_equal_computed_results():
+    pytest.importorskip("gurobipy")
+    from llms_decision_support.python_files.coffee_stochastic_evaluation import StochasticModel
+    from llms_decision_support.python_files.decisions import all_decision_keys
+    stoch_model = StochasticModel.get_reference_model()
+    cache = EvaluationCache()
+    assert cache.prewarm_from_json(stoch_model.model_hash, StochasticModel.exported_results_path, 3) == 72
+    for decision_key in all_decision_keys(3, 2):
+        assert cache.get(stoch_model.model_hash, decision_key) == pytest.approx(stoch_model.compute_profit_distribution(decision_key)), decision_key
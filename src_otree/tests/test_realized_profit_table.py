@@ -0,0 +1,41 @@
+import os
+import numpy as np
+import pytest
+
+pytest.importorskip("gurobipy")
+
+from llms_decision_support.python_files.coffee_data import apply_parameter_changes, get_coffee_network_data
+from llms_decision_support.python_files.coffee_deterministic_evaluation import evaluate_deterministic
+from llms_decision_support.python_files.decisions import all_decision_keys, decisions_from_key
+from llms_decision_support.python_files.realized_profit_table import PROFIT_TABLE_PATH, RealizedProfitTable, realized_profit
+
+def test_shipped_table_matches_evaluate_deterministic():
+    table = RealizedProfitTable.load()
+    assert table is not None, f"{PROFIT_TABLE_PATH} missing or outdated (rebuild with python -m llms_decision_support.python_files.realized_profit_table)"
+    for decision_key in all_decision_keys(len(table.suppliers), len(table.roasteries)):
+        decisions = decisions_from_key(decision_key, table.suppliers, table.roasteries)
+        for column in range(2 ** len(table.nodes)):
+            disruptions = {node: bool(column >> i & 1) for i, node in enumerate(table.nodes)}
+            assert table.lookup(decisions, disruptions) == pytest.approx(evaluate_deterministic(decisions, disruptions)), (decision_key, column)
+
+def test_lookup_misses_fall_back_to_the_solver():
+    table = RealizedProfitTable.load()
+    decisions = {"supplier1": "activate", "supplier3": "activate", "roastery1": "activate (high)"}
+    no_disruptions = {node: False for node in table.nodes}
+    # Decisions not given for all nodes are not in the table
+    assert table.lookup(decisions, no_disruptions) is None
+    assert realized_profit(decisions, no_disruptions) == pytest.approx(evaluate_deterministic(decisions, no_disruptions))
+
+def test_save_and_load(tmp_path):
+    data = get_coffee_network_data()
+    suppliers, roasteries = list(data['s_capacity']), list(data['r_capacity'])
+    profits = np.arange(72 * 32, dtype=np.float32).reshape(72, 32)
+    path = os.path.join(tmp_path, "table.npz")
+    RealizedProfitTable(profits, suppliers, roasteries).save(path)
+
+    loaded = RealizedProfitTable.load(path)
+    np.testing.assert_array_equal(loaded.profits, profits)
+    assert (loaded.suppliers, loaded.roasteries) == (suppliers, roasteries)
+    # Tables of other network data are ignored
+    assert RealizedProfitTable.load(path, data=apply_parameter_changes(data, {"selling_price": 28})) is None
+    assert RealizedProfitTable.load(os.path.join(tmp_path, "missing.npz")) is None
@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("gurobipy")
+
+from llms_decision_support.python_files.coffee_data import get_coffee_network_data
+from llms_decision_support.python_files.coffee_deterministic_evaluation import check_backend_parity
+from llms_decision_support.python_files.decisions import activations_from_key, all_decision_keys
+from llms_decision_support.python_files.recourse_solver import RecourseSolver
+from llms_decision_support.python_files.scenarios import generate_scenarios
+
+def test_deterministic_backend_parity():
+    # All canonical decisions and variants (free nodes, roasteries without level, other wordings) x all disruption outcomes
+    assert check_backend_parity() == []
+
+@pytest.mark.parametrize("scenario_mode", ["sampled", "exact"])
+def test_profit_per_scenario_backend_parity(scenario_mode):
+    data = get_coffee_network_data()
+    suppliers, roasteries = list(data['s_capacity']), list(data['r_capacity'])
+    scenarios, _ = generate_scenarios(data['s_default_prob'], data['r_default_prob'], scenario_mode, data['num_scenarios'])
+    solvers = [RecourseSolver(data, backend="gurobi"), RecourseSolver(data, backend="scipy")]
+    for decision_key in all_decision_keys(len(suppliers), len(roasteries)):
+        activations = activations_from_key(decision_key, suppliers, roasteries)
+        gurobi_profits, scipy_profits = (solver.profit_per_scenario(*activations, scenarios) for solver in solvers)
+        assert gurobi_profits.keys() == scipy_profits.keys()
+        for n in gurobi_profits:
+            assert scipy_profits[n] == pytest.approx(gurobi_profits[n], abs=1e-6), (decision_key, n)
@@ -0,0 +1,55 @@
+import csv
+import os
+import pytest
+
+pytest.importorskip("gurobipy")
+
+from llms_decision_support.python_files.coffee_stochastic_csv_and_json_export import CSV_FILENAME, DATA_DIR
+from llms_decision_support.python_files.coffee_stochastic_evaluation import StochasticModel
+from llms_decision_support.python_files.decisions import all_decision_keys
+from llms_decision_support.python_files.export_worker import evaluate_rows
+
+ALL_KEYS = all_decision_keys(3, 2)
+
+def _distributions(stoch_model, evaluation_engine):
+    stoch_model.evaluation_engine = evaluation_engine
+    return [stoch_model.compute_profit_distribution(decision_key) for decision_key in ALL_KEYS]
+
+@pytest.mark.parametrize("scenario_mode", ["sampled", "exact"])
+def test_engines_agree_for_all_combinations(scenario_mode):
+    # Extensive form (per-scenario profits by one sparse mat-vec product) vs. one flow problem per pattern
+    with StochasticModel(scenario_mode=scenario_mode) as stoch_model:
+        monolithic = _distributions(stoch_model, "monolithic")
+        decomposed = _distributions(stoch_model, "decomposed")
+    for decision_key, monolithic_probs, decomposed_probs in zip(ALL_KEYS, monolithic, decomposed):
+        assert monolithic_probs.keys() == decomposed_probs.keys(), decision_key
+        for profit, prob in monolithic_probs.items():
+            assert decomposed_probs[profit] == pytest.approx(prob), (decision_key, profit)
+
+def test_aggregated_scenarios_give_same_distributions():
+    with StochasticModel(aggregate_scenarios=True) as aggregated, StochasticModel(aggregate_scenarios=False) as unaggregated:
+        assert len(aggregated.scenarios) < len(unaggregated.scenarios)
+        for decision_key in ALL_KEYS:
+            assert aggregated.compute_profit_distribution(decision_key) == pytest.approx(
+                unaggregated.compute_profit_distribution(decision_key)), decision_key
+
+def test_exact_scenario_probabilities():
+    with StochasticModel(scenario_mode="exact") as stoch_model:
+        data = stoch_model.data
+        default_probs = data['s_default_prob'] | data['r_default_prob']
+        risky_nodes = [node for node, prob in default_probs.items() if prob > 0]
+        # All disruption patterns of the risky nodes, with their true probabilities
+        assert len(stoch_model.scenarios) == 2 ** len(risky_nodes)
+        assert float(sum(stoch_model.scenario_probs)) == pytest.approx(1.0)
+        for (s_defs, r_defs), scenario_prob in zip(stoch_model.scenarios, stoch_model.scenario_probs):
+            disrupted = s_defs | r_defs
+            expected_prob = 1.0
+            for node in risky_nodes:
+                expected_prob *= default_probs[node] if disrupted[node] else 1 - default_probs[node]
+            assert float(scenario_prob) == pytest.approx(expected_prob)
+
+def test_rows_match_exported_data():
+    with open(os.path.join(DATA_DIR, CSV_FILENAME), newline="") as f:
+        exported_rows = list(csv.reader(f))[1:]
+    data = StochasticModel.get_reference_model().data
+    assert evaluate_rows(data, "sampled", ALL_KEYS) == exported_rows
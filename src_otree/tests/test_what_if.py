@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip("gurobipy")
+
+from llms_decision_support.python_files.coffee_data import apply_parameter_changes
+from llms_decision_support.python_files.coffee_stochastic_evaluation import StochasticModel
+from llms_decision_support.python_files.decisions import all_decision_keys
+
+PARAMETER_CHANGES = [
+    {"s_capacity": {"supplier2": 150}},
+    {"r_capacity": {"roastery1": {"high": 300}}, "selling_price": 28},
+    {"coffee_demand": {"dark": {"customer3": 80}}, "fixed_income_bonuspool": 2000},
+    {"shipping_cost_s_to_r": {("supplier1", "roastery2"): 6}, "fixed_supplier_cost": {"supplier3": 500}},
+]
+DECISION_KEYS = [(1, 0, 1, 2, 0), (1, 0, 1, 1, 2), (0, 1, 1, 1, 2), (1, 1, 1, 2, 2)]
+
+@pytest.fixture(autouse=True)
+def _empty_caches():
+    # Results of the in-place and the rebuilt model share cache entries (same data hash)
+    StochasticModel.results_cache.clear()
+    StochasticModel.optima_cache.clear()
+    yield
+    StochasticModel.results_cache.clear()
+    StochasticModel.optima_cache.clear()
+
+@pytest.mark.parametrize("parameter_changes", PARAMETER_CHANGES)
+def test_in_place_what_if_equals_rebuilt_model(parameter_changes):
+    with StochasticModel() as stoch_model:
+        in_place = [stoch_model.what_if(parameter_changes, decision_key) for decision_key in DECISION_KEYS]
+        in_place_optimum = stoch_model.what_if(parameter_changes)
+    StochasticModel.results_cache.clear()
+
+    with StochasticModel(data=apply_parameter_changes(stoch_model.data, parameter_changes)) as rebuilt_model:
+        for decision_key, result in zip(DECISION_KEYS, in_place):
+            assert result["scenarios"] == pytest.approx(rebuilt_model.compute_profit_distribution(decision_key)), decision_key
+        rebuilt_optimum = max(rebuilt_model.evaluate_decision_keys(all_decision_keys(3, 2)), key=lambda result: result["ev"])
+    assert in_place_optimum["ev"] == pytest.approx(rebuilt_optimum["ev"])
+
+def test_what_if_reverts_the_model():
+    with StochasticModel() as stoch_model:
+        stoch_model.evaluation_engine = "monolithic"
+        before = [stoch_model.compute_profit_distribution(decision_key) for decision_key in DECISION_KEYS]
+        for parameter_changes in PARAMETER_CHANGES:
+            stoch_model.what_if(parameter_changes)
+        after = [stoch_model.compute_profit_distribution(decision_key) for decision_key in DECISION_KEYS]
+    assert after == before
+
+def test_scenario_parameters_need_new_scenarios():
+    with StochasticModel() as stoch_model:
+        with pytest.raises(ValueError):
+            stoch_model.what_if({"num_scenarios": 500})